@@ -14,13 +14,32 @@ import webbrowser
 import subprocess
 import shutil
 import json
-from datetime import datetime
+import asyncio
+import queue
+import uuid
+import multiprocessing
+from multiprocessing import shared_memory, resource_tracker
+import ipaddress
+import itertools
+import hashlib
+import math
+import re
+import struct
+import xml.etree.ElementTree as ET
+from urllib.parse import urlparse
+from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from onvif import ONVIFCamera, ONVIFError
+from onvif.client import ONVIFService, UsernameDigestTokenDtDiff
+from zeep import Client as ZeepClient, Settings as ZeepSettings
+from zeep.transports import Transport as ZeepTransport
+from zeep.wsdl import Document as WsdlDocument
+import requests
 import netifaces
-from flask import Flask, render_template_string, Response
+from flask import Flask, render_template_string, Response, stream_with_context
 import logging
 import cv2
+import numpy as np
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -31,18 +50,115 @@ app = Flask(__name__)
 # Globale Variable für gefundene Kameras
 found_cameras = []
 
-# Dictionary für aktive Video-Captures
-video_captures = {}
-capture_locks = {}
+# Live-Vorschau: ein Grabber-Thread pro Kamera dekodiert fortlaufend und verteilt das letzte Bild an alle Zuschauer
+# Jeder Zuschauer hat ein Postfach mit nur einem Platz: langsame Clients überspringen veraltete Bilder statt die Kamera zu blockieren
+# Grabber werden beim ersten Zuschauer geöffnet und nach live_grace_period ohne Zuschauer wieder geschlossen
+live_grabbers = {}  # {camera_index: {'thread', 'token', 'stream_url', 'frame', 'seq', 'condition', 'clients', 'idle_since', 'running', 'grabbed', 'retrieved', 'inbox', 'jpeg_cache', 'encode_lock'}}
+live_grabbers_lock = threading.Lock()
+live_prewarmed = {}  # {camera_index: Zeitpunkt des letzten Vorab-Öffnens} - geschützt durch live_grabbers_lock
+
+# Worker-Pool (live_worker_mode = 'processes'): Bilder kommen über Shared Memory, nur Metadaten über Queues
+live_pool = None  # {'processes', 'commands', 'results', 'dispatcher'}
+live_pool_lock = threading.Lock()
+LIVE_SHM_SLOTS = 3  # Ringpuffer-Plätze pro Kamera im Shared Memory
+LIVE_SHM_HEADER = 8  # Generationszähler pro Platz (Seqlock: ungerade = wird gerade beschrieben)
+LIVE_RECONNECT_DELAY = 2  # Sekunden Pause bevor ein abgebrochener Live-Stream neu geöffnet wird
+LIVE_FRAME_TIMEOUT = 5  # Sekunden ohne neues Bild bis ein Zuschauer-Stream beendet wird
+LIVE_IDLE_FPS = 1  # Bildrate ohne Zuschauer (Grace-Period), hält das Bild für /snapshot aktuell
+LIVE_PACING_RESYNC = 1.0  # Sekunden Rückstand (oder Zeitsprung der Quelle) bis die Taktung neu ausgerichtet wird
+LIVE_JPEG_QUALITY = 85  # JPEG-Qualität der Live-Vorschau (Standard, per ?q= änderbar)
+LIVE_MIN_WIDTH = 80  # Grenzen für ?w= (maximale Bildbreite)
+LIVE_MAX_WIDTH = 3840
+LIVE_MAX_FPS = 30  # Obergrenze für ?fps=
+LIVE_PREWARM_INTERVAL = 60  # Sekunden bis ein Seitenaufruf denselben Live-Stream erneut vorab öffnen darf
+
+# Mosaik: alle (oder ausgewählte) Kameras in einem einzigen MJPEG-Stream für Wand-Displays
+MOSAIC_DEFAULT_WIDTH = 1920  # Gesamtbreite in Pixeln (?w=)
+MOSAIC_DEFAULT_FPS = 10  # Bildrate (?fps=)
+MOSAIC_TILE_ASPECT = 16 / 9  # Seitenverhältnis einer Kachel
+MOSAIC_MAX_PIXELS = 3840 * 2160  # Obergrenze für die Gesamtgröße des Mosaiks (4K) - größere Layouts werden abgelehnt
+
+# Einzelbilder (/snapshot): letztes Bild des Live-Grabbers, sonst ONVIF GetSnapshotUri
+snapshot_cache = {}  # {camera_index: {'uri', 'token', 'jpeg', 'time', 'etag', 'variants'}} - nur ONVIF-Fallback
+snapshot_locks = {}  # Pro Kamera: nur eine gleichzeitige Abfrage bei der Kamera
+snapshot_lock = threading.Lock()
+SNAPSHOT_MAX_AGE = 5  # Standard für ?max_age= (maximales Alter eines gelieferten Bildes in Sekunden)
+SNAPSHOT_MAX_AGE_LIMIT = 3600
+SNAPSHOT_MAX_AGE_MIN = 1  # Untergrenze für ?max_age= - sonst löst jeder Abruf mit max_age=0 eine ONVIF-Abfrage aus
+
+# HLS-Live-Vorschau: FFmpeg kopiert den H.264-Sub-Stream ohne Neukodierung in kurze fMP4-Segmente
+hls_sessions = {}  # {camera_index: {'process', 'dir', 'stream_url', 'last_access'}}
+hls_lock = threading.Lock()
+hls_root = None  # Temporäres Verzeichnis für alle HLS-Segmente
+HLS_SEGMENT_DURATION = 1  # Ziel-Segmentlänge in Sekunden (tatsächlich: nächster Keyframe)
+HLS_LIST_SIZE = 6  # Segmente in der Playlist, ältere werden gelöscht
+HLS_START_TIMEOUT = 10  # Sekunden Wartezeit auf die erste Playlist
+HLS_IDLE_TIMEOUT = 30  # Sekunden ohne Abruf bis der FFmpeg-Prozess beendet wird
+HLS_FILE_PATTERN = re.compile(r'^(index\.m3u8|init\.mp4|seg_\d+\.m4s)$')
 
 # Globale Variablen für Aufnahmen
 recording_status = {}  # {camera_index: {'recording': bool, 'writer': VideoWriter, 'filename': str, 'cap': VideoCapture, 'start_time': datetime}}
 recording_locks = {}   # Locks für Thread-sichere Aufnahmen
 recording_start_locks = {}  # Locks um zu verhindern, dass mehrere Aufnahmen gleichzeitig gestartet werden
 
+# Aufnahme-Supervisor: ein asyncio-Event-Loop (eigener Thread) besitzt alle FFmpeg-Prozesse
+recorder_loop = None
+recorder_loop_lock = threading.Lock()
+RECORDER_STOP_TIMEOUT = 3  # Sekunden für sauberes Beenden mit 'q' (fragmentiertes MP4 ist sofort abgeschlossen)
+RECORDER_KILL_TIMEOUT = 2  # Sekunden nach terminate, danach kill
+RECORDER_HUNG_TIMEOUT = 5  # Ohne Fortschrittsmeldung seit so vielen Sekunden gilt FFmpeg als hängend
+RECORDER_RESTART_DELAY = 2  # Pause vor Neustart nach Verbindungsabbruch
+SEGMENT_ROTATION_GRACE = 30  # Sekunden nach einer Segment-Grenze, bis das neue Segment begonnen haben muss
+
 # Scan-Status
 scan_in_progress = False
 scan_lock = threading.Lock()
+scan_found = []  # (index, kamera) des laufenden Scans - für später angemeldete Zuschauer
+scan_listeners = []  # listener(event, daten) - 'camera' (index, kamera) bzw. 'done' {'success', 'cameras'}
+cameras_lock = threading.Lock()  # Schützt Änderungen an found_cameras (Liste wird nur in-place erweitert)
+
+# Präsenz-Monitor: günstige Lebenszeichen-Prüfung bekannter Kameras statt vollständiger Neuscans
+PRESENCE_CHECK_INTERVAL = 5  # Sekunden zwischen zwei Prüfrunden
+PRESENCE_FAILURE_THRESHOLD = 2  # Fehlgeschlagene Prüfungen in Folge bis eine Kamera als offline gilt
+PRESENCE_SWEEP_BATCH = 64  # Neue Adressen pro Prüfrunde (langsamer Hintergrund-Sweep)
+
+# Port-Sweep Konfiguration (asyncio)
+SWEEP_CONNECT_TIMEOUT = 0.3  # Start-Timeout pro TCP-Verbindungsversuch, solange keine RTT-Messungen vorliegen
+SWEEP_MAX_CONNECTIONS = 512  # Maximale Anzahl gleichzeitig offener Verbindungsversuche (Dateideskriptor-Limit beachten)
+ONVIF_MAX_WORKERS = 32  # Threads für die ONVIF-Prüfung der erreichbaren Hosts
+
+# Adaptive Timeouts: aus der gemessenen RTT antwortender Hosts im selben Subnetz (wie TCP, RFC 6298)
+ADAPTIVE_TIMEOUT_MIN = 0.05  # Untergrenze in Sekunden
+ADAPTIVE_TIMEOUT_MAX = 1.0  # Obergrenze in Sekunden
+SOAP_TIMEOUT = 4  # Obergrenze für ONVIF/SOAP-Aufrufe in Sekunden
+rtt_stats = {}  # {subnetz: {'srtt': float, 'rttvar': float, 'samples': int}}
+host_rtt_stats = {}  # {host: {'srtt', 'rttvar', 'samples'}} - eigene RTT langsamer Hosts verlängert nur deren Frist
+rtt_lock = threading.Lock()
+
+# Circuit Breaker: Hosts/Ports, die wiederholt nicht antworten, werden eine Zeit lang übersprungen
+BREAKER_FAILURE_THRESHOLD = 3  # Fehlversuche in Folge bis der Host übersprungen wird
+BREAKER_COOLDOWN = 120  # Sekunden bis zum nächsten Versuch
+host_failures = {}  # {(host, port): {'failures': int, 'open_until': float}}
+breaker_lock = threading.Lock()
+
+# WS-Discovery Konfiguration (ONVIF Multicast-Erkennung)
+WS_DISCOVERY_ADDRESS = ('239.255.255.250', 3702)  # Standard Multicast-Gruppe und Port
+WS_DISCOVERY_TIMEOUT = 2.0  # Wartezeit auf ProbeMatch-Antworten in Sekunden
+
+# Profil-Auswahl für Main-Stream (Aufnahme) und Sub-Stream (Live-Vorschau)
+# Strategien: 'highest', 'lowest', 'closest' (mit Ziel-Auflösung (Breite, Höhe))
+MAIN_STREAM_POLICY = 'highest'
+MAIN_STREAM_TARGET = None
+SUB_STREAM_POLICY = 'lowest'
+SUB_STREAM_TARGET = None  # z.B. (640, 360) zusammen mit 'closest'
+
+# ONVIF/zeep Client-Cache: WSDLs werden nur einmal geparst, pro Kamera eine HTTP-Session mit Keep-Alive
+ZEEP_SETTINGS = ZeepSettings(strict=False, xml_huge_tree=True)
+wsdl_documents = {}  # {wsdl_path: geparstes zeep WSDL-Dokument}
+wsdl_lock = threading.Lock()
+onvif_transports = {}  # {(host, port): zeep Transport mit requests.Session}
+onvif_cameras = {}  # {(host, port, username, password): CachedONVIFCamera}
+onvif_cache_lock = threading.Lock()
 
 # Video-Aufnahme Konfiguration
 VIDEO_QUALITY = 65  # Qualität für Video-Aufnahmen (0-100, höher = bessere Qualität, größere Datei)
@@ -50,6 +166,12 @@ VIDEO_QUALITY = 65  # Qualität für Video-Aufnahmen (0-100, höher = bessere Qu
 # Konfigurationsdatei
 CONFIG_FILE = 'config.json'
 
+# Kamera-Registry: zuletzt gefundene Kameras für schnellen Neustart ohne Netzwerk-Scan
+CAMERA_REGISTRY_FILE = 'cameras.json'
+REGISTRY_FIELDS = ('host', 'port', 'name', 'stream_url', 'live_stream_url',
+                   'main_profile_token', 'sub_profile_token', 'profiles', 'last_seen')
+registry_lock = threading.Lock()
+
 # Globale Login-Daten für alle Kameras (werden aus config.json geladen)
 camera_username = 'admin'
 camera_password = '123456'
@@ -57,10 +179,47 @@ credentials_lock = threading.Lock()
 
 # Aufnahme-Einstellungen (werden aus config.json geladen)
 record_half_resolution = True  # True = halbierte Auflösung für Aufnahmen (Standard: True)
+# 'copy' = Video der Kamera unverändert übernehmen (kaum CPU), 'transcode' = immer mit libx264 neu kodieren
+# Bei halbierter Auflösung wird immer neu kodiert
+record_mode = 'copy'
+RECORD_MODES = ('copy', 'transcode')
+COPY_VIDEO_CODECS = ('h264', 'hevc')  # In MP4 ohne Neukodierung speicherbar
+COPY_AUDIO_CODECS = ('aac',)  # Andere Audio-Codecs (z.B. G.711) werden nach AAC kodiert
+# Segment-Länge in Sekunden; Segmente beginnen an festen Uhrzeit-Grenzen (bei 600: :00, :10, :20 ...)
+# Muss eine Stunde ohne Rest teilen, damit jeder Stunden-Ordner nur ganze Segmente enthält
+segment_duration = 600
+SEGMENT_MIN_DURATION = 60
+# Aufnahme-Metriken: Geschwindigkeit unter RECORD_SPEED_WARNING (1.0 = Echtzeit) länger als
+# RECORD_SPEED_WARNING_DURATION Sekunden bedeutet, dass FFmpeg hinter dem Stream zurückfällt
+RECORD_SPEED_WARNING = 0.95
+RECORD_SPEED_WARNING_DURATION = 10
+
+# Scan-Bereiche (werden aus config.json geladen)
+# scan_networks: Liste von CIDR-Bereichen, leer = automatisch aus den Netzwerk-Interfaces
+scan_networks = []
+scan_ports = [888, 835]
+DEFAULT_SCAN_NETWORK = '192.168.100.0/24'  # Fallback wenn kein Interface gefunden wird
+SCAN_MAX_INTERFACE_HOSTS = 1024  # Größere Interface-Netze werden auf das eigene /24 begrenzt
+SCAN_MAX_NETWORK_HOSTS = 65536  # Größere Bereiche aus scan_networks (z.B. /8) werden abgelehnt
+
+# Live-Vorschau: Sekunden, die ein Grabber nach dem letzten Zuschauer noch offen bleibt (wird aus config.json geladen)
+live_grace_period = 30
+
+# Live-Vorschau: Dekodieren/Kodieren in Threads dieses Prozesses oder in einem Pool von Worker-Prozessen
+# (wird aus config.json geladen); live_workers = Anzahl Prozesse bzw. OpenCV-Threads, 0 = Anzahl CPU-Kerne
+live_worker_mode = 'threads'
+live_workers = 0
+LIVE_WORKER_MODES = ('threads', 'processes')
+
+# Erkennungs-Modus (wird aus config.json geladen)
+# 'auto' = WS-Discovery, bei keinem Treffer Port-Sweep | 'ws-discovery' = nur Multicast | 'sweep' = nur Port-Sweep
+discovery_mode = 'auto'
+DISCOVERY_MODES = ('auto', 'ws-discovery', 'sweep')
 
 # FFmpeg Verfügbarkeit
 ffmpeg_available = None
 ffmpeg_path = None
+stream_codec_cache = {}  # {stream_url: {'video': codec, 'audio': codec}} - Ergebnis von ffprobe
 
 # HTML Template für die Web-Oberfläche
 HTML_TEMPLATE = """
@@ -562,6 +721,7 @@ HTML_TEMPLATE = """
         <button class="btn" onclick="scanCameras()">🔍 Kameras scannen</button>
         <button class="btn" onclick="location.reload()">🔄 Seite aktualisieren</button>
         <button class="btn" onclick="showRecordings()">📁 Aufnahmen anzeigen</button>
+        <button class="btn" onclick="window.open('/mosaic', '_blank')">🖼 Mosaik (alle Kameras)</button>
     </div>
     
     <!-- Recordings Modal -->
@@ -590,10 +750,10 @@ HTML_TEMPLATE = """
     <div class="grid">
         {% if cameras %}
             {% for camera in cameras %}
-            <div class="camera-card">
+            <div class="camera-card" data-camera-index="{{ loop.index0 }}">
                 <div class="camera-header">
                     <h3>{{ camera.name }}</h3>
-                    <p>{{ camera.host }}:{{ camera.port }}</p>
+                    <p>{{ camera.host }}:{{ camera.port }} <span id="online-{{ loop.index0 }}" style="color: #f44336;">{% if camera.online == false %}● offline{% endif %}</span></p>
                     <div class="recording-controls">
                         <button class="btn-record" onclick="toggleRecording({{ loop.index0 }})" id="record-btn-{{ loop.index0 }}">
                             <span id="record-text-{{ loop.index0 }}">⏺ Aufnahme starten</span>
@@ -604,7 +764,7 @@ HTML_TEMPLATE = """
                 </div>
                 <div class="video-container">
                     {% if camera.stream_url %}
-                        <img src="/stream/{{ loop.index0 }}" alt="Camera Stream" style="width: 100%; height: 100%; object-fit: contain;">
+                        <img class="live-view" data-camera-index="{{ loop.index0 }}" src="/stream/{{ loop.index0 }}" alt="Camera Stream" style="width: 100%; height: 100%; object-fit: contain;">
                     {% else %}
                         <div class="error-message">
                             ⚠️ Keine Stream-URL verfügbar
@@ -622,8 +782,69 @@ HTML_TEMPLATE = """
     </div>
     
     <script>
+        // HLS-Live-Vorschau (ohne Neukodierung), wenn der Browser HLS nativ abspielen kann - sonst MJPEG
+        const hlsAvailable = {{ 'true' if hls_available else 'false' }};
+        function enableHlsLiveView() {
+            const probe = document.createElement('video');
+            if (!hlsAvailable || !probe.canPlayType('application/vnd.apple.mpegurl')) return;
+            document.querySelectorAll('img.live-view').forEach(img => {
+                const idx = img.dataset.cameraIndex;
+                const video = document.createElement('video');
+                video.className = 'live-view';
+                video.muted = true;
+                video.autoplay = true;
+                video.playsInline = true;
+                video.style.cssText = img.style.cssText;
+                video.src = `/hls/${idx}/index.m3u8`;
+                video.addEventListener('error', () => {
+                    // Fallback auf MJPEG
+                    video.replaceWith(img);
+                    img.src = `/stream/${idx}?w=${Math.round(img.clientWidth * (window.devicePixelRatio || 1))}`;
+                });
+                img.src = '';
+                img.replaceWith(video);
+            });
+        }
+        enableHlsLiveView();
+        
+        // MJPEG-Vorschau nur in der tatsächlichen Kachelbreite anfordern
+        function sizeMjpegLiveView() {
+            const scale = window.devicePixelRatio || 1;
+            document.querySelectorAll('img.live-view').forEach(img => {
+                const width = Math.round(img.clientWidth * scale);
+                if (width > 0) {
+                    img.src = `/stream/${img.dataset.cameraIndex}?w=${width}`;
+                }
+            });
+        }
+        sizeMjpegLiveView();
+        
         function scanCameras() {
             document.getElementById('status').textContent = 'Suche nach Kameras...';
+            if (window.EventSource) {
+                // Gefundene Kameras erscheinen sofort, nicht erst nach dem gesamten Scan
+                const source = new EventSource('/scan/stream');
+                let found = 0;
+                source.addEventListener('camera', event => {
+                    const camera = JSON.parse(event.data);
+                    found++;
+                    document.getElementById('status').textContent =
+                        `Suche nach Kameras... ${found} gefunden (zuletzt: ${camera.name} ${camera.host}:${camera.port})`;
+                });
+                source.addEventListener('done', event => {
+                    source.close();
+                    const data = JSON.parse(event.data);
+                    document.getElementById('status').textContent = data.success ? data.message : 'Fehler: ' + data.message;
+                    if (data.success) {
+                        setTimeout(() => location.reload(), 2000);
+                    }
+                });
+                source.onerror = () => {
+                    source.close();
+                    document.getElementById('status').textContent = 'Fehler beim Scannen';
+                };
+                return;
+            }
             fetch('/scan', {method: 'POST'})
                 .then(response => response.json())
                 .then(data => {
@@ -906,6 +1127,11 @@ HTML_TEMPLATE = """
                         const text = document.getElementById(`record-text-${idx}`);
                         const statusEl = document.getElementById(`record-status-${idx}`);
                         const modeEl = document.getElementById(`record-mode-${idx}`);
+                        const onlineEl = document.getElementById(`online-${idx}`);
+                        
+                        if (onlineEl) {
+                            onlineEl.textContent = status.online === false ? '● offline' : '';
+                        }
                         
                         if (!btn || !text || !statusEl) continue;
                         
@@ -924,8 +1150,24 @@ HTML_TEMPLATE = """
                             // Zeige Aufnahme-Modus (FFmpeg oder OpenCV)
                             if (modeEl) {
                                 if (status.use_ffmpeg) {
-                                    modeEl.textContent = '🎤 FFmpeg (mit Audio)';
+                                    modeEl.textContent = status.record_mode === 'copy'
+                                        ? '🎤 FFmpeg (mit Audio, ohne Neukodierung)'
+                                        : '🎤 FFmpeg (mit Audio)';
                                     modeEl.style.color = '#4CAF50';
+                                    const metrics = status.metrics;
+                                    if (metrics && metrics.speed !== null) {
+                                        modeEl.textContent += ` · ${metrics.speed.toFixed(2)}x`;
+                                        if (metrics.bitrate_kbps) {
+                                            modeEl.textContent += ` · ${Math.round(metrics.bitrate_kbps)} kbit/s`;
+                                        }
+                                        if (metrics.drop_frames) {
+                                            modeEl.textContent += ` · ${metrics.drop_frames} verworfen`;
+                                        }
+                                        if (metrics.falling_behind) {
+                                            modeEl.textContent += ' · ⚠ langsamer als Echtzeit';
+                                            modeEl.style.color = '#ff9800';
+                                        }
+                                    }
                                 } else {
                                     modeEl.textContent = '📹 OpenCV (ohne Audio)';
                                     modeEl.style.color = '#ff9800';
@@ -955,7 +1197,7 @@ HTML_TEMPLATE = """
 
 def load_config():
     """Lädt Konfiguration aus config.json"""
-    global camera_username, camera_password, record_half_resolution
+    global camera_username, camera_password, record_half_resolution, discovery_mode, scan_networks, scan_ports, live_grace_period, live_worker_mode, live_workers, record_mode, segment_duration
     
     if not os.path.exists(CONFIG_FILE):
         logger.info("Keine Konfigurationsdatei gefunden, verwende Standardwerte")
@@ -970,8 +1212,29 @@ def load_config():
             camera_username = config.get('username', 'admin')
             camera_password = config.get('password', '123456')
             record_half_resolution = config.get('half_resolution', True)
-        
-        logger.info(f"Konfiguration geladen: Username={camera_username}, HalfResolution={record_half_resolution}")
+            discovery_mode = config.get('discovery_mode', 'auto')
+            if discovery_mode not in DISCOVERY_MODES:
+                logger.warning(f"Unbekannter Erkennungs-Modus '{discovery_mode}', verwende 'auto'")
+                discovery_mode = 'auto'
+            scan_networks = list(config.get('scan_networks', []))
+            scan_ports = [int(p) for p in config.get('scan_ports', [888, 835])]
+            live_grace_period = max(0, float(config.get('live_grace_period', 30)))
+            live_worker_mode = config.get('live_worker_mode', 'threads')
+            if live_worker_mode not in LIVE_WORKER_MODES:
+                logger.warning(f"Unbekannter Live-Worker-Modus '{live_worker_mode}', verwende 'threads'")
+                live_worker_mode = 'threads'
+            live_workers = max(0, int(config.get('live_workers', 0)))
+            record_mode = config.get('record_mode', 'copy')
+            if record_mode not in RECORD_MODES:
+                logger.warning(f"Unbekannter Aufnahme-Modus '{record_mode}', verwende 'copy'")
+                record_mode = 'copy'
+            segment_duration = int(config.get('segment_duration', 600))
+            if segment_duration < SEGMENT_MIN_DURATION or 3600 % segment_duration:
+                logger.warning(f"Ungültige Segment-Länge {segment_duration}s (muss eine Stunde teilen), verwende 600")
+                segment_duration = 600
+        
+        logger.info(f"Konfiguration geladen: Username={camera_username}, HalfResolution={record_half_resolution}, "
+                    f"Discovery={discovery_mode}, Netze={scan_networks or 'automatisch'}, Ports={scan_ports}")
     except Exception as e:
         logger.error(f"Fehler beim Laden der Konfiguration: {e}, verwende Standardwerte")
         save_config()  # Erstelle Standard-Konfigurationsdatei bei Fehler
@@ -979,14 +1242,22 @@ def load_config():
 
 def save_config():
     """Speichert aktuelle Konfiguration in config.json"""
-    global camera_username, camera_password, record_half_resolution
+    global camera_username, camera_password, record_half_resolution, discovery_mode, scan_networks, scan_ports, live_grace_period, live_worker_mode, live_workers, record_mode, segment_duration
     
     try:
         with credentials_lock:
             config = {
                 'username': camera_username,
                 'password': camera_password,
-                'half_resolution': record_half_resolution
+                'half_resolution': record_half_resolution,
+                'discovery_mode': discovery_mode,
+                'scan_networks': scan_networks,
+                'scan_ports': scan_ports,
+                'live_grace_period': live_grace_period,
+                'live_worker_mode': live_worker_mode,
+                'live_workers': live_workers,
+                'record_mode': record_mode,
+                'segment_duration': segment_duration
             }
         
         # Erstelle Backup der alten Konfiguration falls vorhanden
@@ -1088,208 +1359,720 @@ def check_ffmpeg():
     return False, None
 
 
-def get_local_network():
-    """Ermittelt das lokale Netzwerk - fokussiert auf 192.168.100.0/24"""
-    return "192.168.100"
+def find_ffprobe():
+    """Sucht ffprobe neben der gefundenen FFmpeg-Datei oder im PATH"""
+    ffmpeg_avail, ffmpeg_cmd = check_ffmpeg()
+    if ffmpeg_avail:
+        name = 'ffprobe.exe' if platform.system() == 'Windows' else 'ffprobe'
+        candidate = os.path.join(os.path.dirname(ffmpeg_cmd), name)
+        if os.path.isfile(candidate):
+            return candidate
+    return shutil.which('ffprobe')
+
+
+def probe_stream_codecs(stream_url, camera=None):
+    """Ermittelt Video- und Audio-Codec eines Streams ({'video': 'h264', 'audio': 'pcm_alaw'})
+    Verwendet ffprobe, sonst die Encoder-Angabe aus dem ONVIF-Profil (Audio dann unbekannt)"""
+    if stream_url in stream_codec_cache:
+        return stream_codec_cache[stream_url]
+    
+    codecs = {'video': None, 'audio': None}
+    ffprobe_cmd = find_ffprobe()
+    if ffprobe_cmd:
+        probe_args = [ffprobe_cmd, '-v', 'error']
+        if stream_url.startswith('rtsp'):
+            probe_args.extend(['-rtsp_transport', 'tcp'])
+        probe_args.extend(['-show_entries', 'stream=codec_type,codec_name', '-of', 'json', stream_url])
+        try:
+            result = subprocess.run(probe_args, capture_output=True, timeout=15)
+            for stream in json.loads(result.stdout or b'{}').get('streams', []):
+                codec_type = stream.get('codec_type')
+                if codec_type in codecs and codecs[codec_type] is None:
+                    codecs[codec_type] = stream.get('codec_name')
+        except Exception as e:
+            logger.debug(f"ffprobe fehlgeschlagen für {stream_url}: {e}")
+    
+    if codecs['video'] is None and camera is not None:
+        # ONVIF meldet z.B. 'H264' oder 'H265'
+        token = camera.get('main_profile_token')
+        for profile in camera.get('profiles') or []:
+            if profile.get('token') == token and profile.get('encoding'):
+                encoding = profile['encoding'].lower()
+                codecs['video'] = {'h265': 'hevc', 'hevc': 'hevc', 'h264': 'h264'}.get(encoding, encoding)
+    
+    if codecs['video'] is not None:
+        stream_codec_cache[stream_url] = codecs
+    return codecs
+
+
+def get_local_networks():
+    """Ermittelt die IPv4-Netze aller Netzwerk-Interfaces (ohne Loopback und Link-Local)
+    Sehr große Netze werden auf das /24 der eigenen Adresse begrenzt"""
+    networks = []
+    for interface in netifaces.interfaces():
+        try:
+            addresses = netifaces.ifaddresses(interface).get(netifaces.AF_INET, [])
+        except ValueError:
+            continue
+        for entry in addresses:
+            addr = entry.get('addr')
+            netmask = entry.get('netmask')
+            if not addr or not netmask:
+                continue
+            try:
+                ip = ipaddress.IPv4Address(addr)
+                network = ipaddress.IPv4Network(f"{addr}/{netmask}", strict=False)
+            except ValueError:
+                continue
+            if ip.is_loopback or ip.is_link_local:
+                continue
+            if network.num_addresses > SCAN_MAX_INTERFACE_HOSTS:
+                logger.info(f"Netz {network} an {interface} zu groß, scanne nur {addr}/24")
+                network = ipaddress.IPv4Network(f"{addr}/24", strict=False)
+            if str(network) not in networks:
+                networks.append(str(network))
+    
+    if not networks:
+        logger.warning(f"Keine Netzwerk-Interfaces gefunden, verwende {DEFAULT_SCAN_NETWORK}")
+        networks = [DEFAULT_SCAN_NETWORK]
+    return networks
+
+
+def get_scan_networks():
+    """Zu scannende CIDR-Bereiche: aus config.json oder automatisch aus den Interfaces"""
+    with credentials_lock:
+        configured = list(scan_networks)
+    return configured or get_local_networks()
+
+
+def parse_networks(networks):
+    """CIDR-Bereiche als ip_network-Objekte (ungültige werden ausgelassen)"""
+    parsed = []
+    for cidr in networks:
+        try:
+            parsed.append(ipaddress.ip_network(cidr, strict=False))
+        except ValueError:
+            continue
+    return parsed
+
+
+def get_remote_networks(networks, local_networks):
+    """Bereiche ohne Überschneidung mit einem lokalen Netz - WS-Discovery (Multicast, TTL 1)
+    erreicht sie nicht, sie müssen per Port-Sweep gescannt werden"""
+    local = parse_networks(local_networks)
+    remote = []
+    for cidr in networks:
+        try:
+            network = ipaddress.ip_network(cidr, strict=False)
+        except ValueError:
+            remote.append(cidr)  # build_sweep_targets meldet den Fehler
+            continue
+        if not any(network.version == other.version and network.overlaps(other) for other in local):
+            remote.append(cidr)
+    return remote
+
+
+def host_in_networks(host, networks):
+    """True wenn host in einem der CIDR-Bereiche liegt"""
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in parse_networks(networks))
+
+
+def get_scan_ports():
+    """Zu scannende ONVIF-Ports aus config.json"""
+    with credentials_lock:
+        return list(scan_ports)
+
+
+def build_sweep_targets(networks, ports):
+    """Erstellt alle (host, port)-Paare der CIDR-Bereiche
+    Die Subnetze werden reihum verschränkt, damit sie unter dem gemeinsamen
+    Verbindungsbudget gleichzeitig gescannt werden statt nacheinander"""
+    per_network = []
+    for cidr in networks:
+        try:
+            network = ipaddress.ip_network(cidr, strict=False)
+        except ValueError:
+            logger.warning(f"Ungültiger Netzbereich übersprungen: {cidr}")
+            continue
+        if network.version != 4:
+            logger.warning(f"Nur IPv4-Bereiche werden gescannt, übersprungen: {cidr}")
+            continue
+        if network.num_addresses > SCAN_MAX_NETWORK_HOSTS:
+            logger.warning(f"Netzbereich {cidr} zu groß (max. {SCAN_MAX_NETWORK_HOSTS} Adressen), übersprungen")
+            continue
+        per_network.append([(str(ip), port) for ip in network.hosts() for port in ports])
+    
+    targets = []
+    for group in itertools.zip_longest(*per_network):
+        targets.extend(target for target in group if target is not None)
+    return targets
+
+
+def subnet_key(host):
+    """Subnetz-Schlüssel für RTT-Statistiken (/24)"""
+    return host.rsplit('.', 1)[0]
+
+
+def record_rtt(host, rtt):
+    """Aktualisiert die geglättete RTT des Subnetzes und des Hosts mit einer neuen Messung (RFC 6298)"""
+    with rtt_lock:
+        for table, key in ((rtt_stats, subnet_key(host)), (host_rtt_stats, host)):
+            stats = table.get(key)
+            if stats is None:
+                table[key] = {'srtt': rtt, 'rttvar': rtt / 2, 'samples': 1}
+                continue
+            stats['rttvar'] = 0.75 * stats['rttvar'] + 0.25 * abs(stats['srtt'] - rtt)
+            stats['srtt'] = 0.875 * stats['srtt'] + 0.125 * rtt
+            stats['samples'] += 1
+
+
+def adaptive_timeout(host):
+    """Verbindungs-Timeout für einen Host: SRTT + 4·RTTVAR des Subnetzes, begrenzt auf MIN..MAX
+    Hat der Host selbst schon geantwortet und ist langsamer als seine Nachbarn, gilt seine eigene
+    (längere) Frist - tote Adressen im Subnetz behalten die kurze. Ohne Messungen: SWEEP_CONNECT_TIMEOUT"""
+    with rtt_lock:
+        stats = rtt_stats.get(subnet_key(host))
+        if stats is None:
+            return SWEEP_CONNECT_TIMEOUT
+        timeout = stats['srtt'] + 4 * stats['rttvar']
+        own = host_rtt_stats.get(host)
+        if own is not None:
+            timeout = max(timeout, own['srtt'] + 4 * own['rttvar'])
+    return min(max(timeout, ADAPTIVE_TIMEOUT_MIN), ADAPTIVE_TIMEOUT_MAX)
+
+
+def record_host_result(host, port, success):
+    """Circuit Breaker: zählt Fehlversuche und sperrt Hosts, die wiederholt nicht antworten"""
+    key = (host, port)
+    with breaker_lock:
+        if success:
+            host_failures.pop(key, None)
+            return
+        entry = host_failures.setdefault(key, {'failures': 0, 'open_until': 0})
+        entry['failures'] += 1
+        if entry['failures'] >= BREAKER_FAILURE_THRESHOLD:
+            entry['open_until'] = time.time() + BREAKER_COOLDOWN
+
 
+def host_blocked(host, port):
+    """True wenn der Circuit Breaker für diesen Host/Port offen ist (Host wird übersprungen)"""
+    with breaker_lock:
+        entry = host_failures.get((host, port))
+        return entry is not None and entry['open_until'] > time.time()
 
-def check_port(host, port, timeout=0.3):
-    """Prüft ob ein Port auf einem Host offen ist"""
+
+def check_port(host, port, timeout=None):
+    """Prüft ob ein Port auf einem Host offen ist (timeout=None: adaptiver Timeout aus RTT)"""
+    if timeout is None:
+        timeout = adaptive_timeout(host)
     try:
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         sock.settimeout(timeout)
+        start = time.time()
         result = sock.connect_ex((host, port))
+        elapsed = time.time() - start
         sock.close()
+        if result == 0:
+            record_rtt(host, elapsed)
+        record_host_result(host, port, result == 0)
         return result == 0
     except:
         return False
 
 
+async def _async_check_port(host, port, timeout, on_open=None):
+    """Prüft einen Port nicht-blockierend (Teil des asyncio Port-Sweeps)
+    timeout=None: Die Frist wird laufend aus der RTT bereits antwortender Hosts im Subnetz
+    neu berechnet, damit tote Adressen nicht bis zum festen Timeout warten"""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    connect = asyncio.ensure_future(asyncio.open_connection(host, port))
+    while True:
+        limit = timeout if timeout is not None else adaptive_timeout(host)
+        remaining = start + limit - loop.time()
+        if remaining <= 0:
+            connect.cancel()
+            record_host_result(host, port, False)
+            return False
+        done, _ = await asyncio.wait({connect}, timeout=min(remaining, ADAPTIVE_TIMEOUT_MIN))
+        if done:
+            break
+    
+    try:
+        _, writer = connect.result()
+    except OSError:
+        # Verbindung abgelehnt: Host antwortet, aber Port ist geschlossen
+        record_rtt(host, loop.time() - start)
+        record_host_result(host, port, False)
+        return False
+    
+    record_rtt(host, loop.time() - start)
+    record_host_result(host, port, True)
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except Exception:
+        pass
+    if on_open is not None:
+        on_open(host, port)
+    return True
+
+
+async def _async_port_sweep(targets, timeout, max_connections, on_open=None):
+    """Prüft alle Ziele mit höchstens max_connections gleichzeitigen Verbindungsversuchen
+    Eine feste Anzahl Worker holt die Ziele nacheinander ab - keine Coroutine pro Ziel,
+    damit der Speicherbedarf auch bei großen Bereichen begrenzt bleibt"""
+    pending = iter(targets)
+    open_hosts = []
+    
+    async def worker():
+        for host, port in pending:
+            if await _async_check_port(host, port, timeout, on_open):
+                open_hosts.append((host, port))
+    
+    await asyncio.gather(*(worker() for _ in range(max(1, min(max_connections, len(targets))))))
+    return open_hosts
+
+
+def sweep_ports(targets, timeout=None, max_connections=SWEEP_MAX_CONNECTIONS, on_open=None):
+    """Prüft viele (host, port)-Paare gleichzeitig mit nicht-blockierenden TCP-Verbindungen
+    Gibt nur die erreichbaren Paare zurück - ersetzt den blockierenden check_port pro Host
+    on_open(host, port) wird sofort für jeden erreichbaren Host aufgerufen (vor Ende des Sweeps)
+    timeout=None: adaptiver Timeout; Hosts mit offenem Circuit Breaker werden übersprungen"""
+    targets = [(host, port) for host, port in targets if not host_blocked(host, port)]
+    if not targets:
+        return []
+    return asyncio.run(_async_port_sweep(targets, timeout, max_connections, on_open))
+
+
+WS_DISCOVERY_PROBE = """<?xml version="1.0" encoding="UTF-8"?>
+<e:Envelope xmlns:e="http://www.w3.org/2003/05/soap-envelope"
+            xmlns:w="http://schemas.xmlsoap.org/ws/2004/08/addressing"
+            xmlns:d="http://schemas.xmlsoap.org/ws/2005/04/discovery"
+            xmlns:dn="http://www.onvif.org/ver10/network/wsdl">
+    <e:Header>
+        <w:MessageID>uuid:{message_id}</w:MessageID>
+        <w:To e:mustUnderstand="true">urn:schemas-xmlsoap-org:ws:2005:04:discovery</w:To>
+        <w:Action e:mustUnderstand="true">http://schemas.xmlsoap.org/ws/2005/04/discovery/Probe</w:Action>
+    </e:Header>
+    <e:Body>
+        <d:Probe>
+            <d:Types>dn:NetworkVideoTransmitter</d:Types>
+        </d:Probe>
+    </e:Body>
+</e:Envelope>"""
+
+WS_ADDRESSING_NS = 'http://schemas.xmlsoap.org/ws/2004/08/addressing'
+WS_DISCOVERY_NS = 'http://schemas.xmlsoap.org/ws/2005/04/discovery'
+
+
+def parse_probe_matches(data, message_id=None):
+    """Parst eine WS-Discovery ProbeMatches-Antwort
+    Gibt Liste von Dicts zurück: {'address': EndpointReference, 'xaddrs': [...], 'scopes': [...]}"""
+    try:
+        root = ET.fromstring(data)
+    except ET.ParseError:
+        return []
+    
+    # Antworten auf fremde Probes ignorieren
+    if message_id:
+        relates_to = root.find(f'.//{{{WS_ADDRESSING_NS}}}RelatesTo')
+        if relates_to is not None and (relates_to.text or '').strip() != f'uuid:{message_id}':
+            return []
+    
+    matches = []
+    for match in root.iter(f'{{{WS_DISCOVERY_NS}}}ProbeMatch'):
+        address = match.find(f'{{{WS_ADDRESSING_NS}}}EndpointReference/{{{WS_ADDRESSING_NS}}}Address')
+        xaddrs = match.find(f'{{{WS_DISCOVERY_NS}}}XAddrs')
+        scopes = match.find(f'{{{WS_DISCOVERY_NS}}}Scopes')
+        matches.append({
+            'address': (address.text or '').strip() if address is not None else '',
+            'xaddrs': (xaddrs.text or '').split() if xaddrs is not None else [],
+            'scopes': (scopes.text or '').split() if scopes is not None else []
+        })
+    return matches
+
+
+def xaddr_to_host_port(xaddr):
+    """Extrahiert (host, port) aus einer XAddr-URL, z.B. http://192.168.100.7:888/onvif/device_service"""
+    try:
+        parsed = urlparse(xaddr)
+        if not parsed.hostname:
+            return None
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        return parsed.hostname, port
+    except ValueError:
+        return None
+
+
+def ws_discovery_probe(timeout=WS_DISCOVERY_TIMEOUT, target=WS_DISCOVERY_ADDRESS):
+    """Sucht ONVIF-Geräte per WS-Discovery (UDP Multicast Probe/ProbeMatch)
+    Ein Probe an die Multicast-Gruppe, alle Geräte antworten mit ihren XAddrs.
+    target kann auch eine Unicast-Adresse sein (z.B. lokaler Test-Responder)"""
+    message_id = str(uuid.uuid4())
+    probe = WS_DISCOVERY_PROBE.format(message_id=message_id).encode('utf-8')
+    devices = {}
+    
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    try:
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+        sock.bind(('', 0))
+        # UDP ist unzuverlässig - Probe zweimal senden, Antworten werden dedupliziert
+        for _ in range(2):
+            sock.sendto(probe, target)
+        
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            sock.settimeout(remaining)
+            try:
+                data, sender = sock.recvfrom(65535)
+            except socket.timeout:
+                break
+            for match in parse_probe_matches(data, message_id):
+                key = match['address'] or sender[0]
+                if key not in devices:
+                    devices[key] = match
+                    logger.debug(f"WS-Discovery Antwort von {sender[0]}: {match['xaddrs']}")
+    except OSError as e:
+        logger.warning(f"WS-Discovery fehlgeschlagen: {e}")
+    finally:
+        sock.close()
+    
+    return list(devices.values())
+
+
+def discover_ws_targets(timeout=WS_DISCOVERY_TIMEOUT):
+    """Ermittelt (host, port)-Paare aller per WS-Discovery gefundenen ONVIF-Geräte"""
+    targets = []
+    for device in ws_discovery_probe(timeout=timeout):
+        for xaddr in device['xaddrs']:
+            host_port = xaddr_to_host_port(xaddr)
+            # Nur IPv4-Adressen (IPv6-XAddrs werden übersprungen)
+            if host_port and ':' not in host_port[0]:
+                if host_port not in targets:
+                    targets.append(host_port)
+                break
+    logger.info(f"WS-Discovery: {len(targets)} ONVIF-Gerät(e) gefunden")
+    return targets
+
+
+def get_wsdl_document(wsdl_path):
+    """Gibt das geparste WSDL-Dokument zurück - wird pro Datei nur einmal geparst und dann geteilt"""
+    with wsdl_lock:
+        document = wsdl_documents.get(wsdl_path)
+        if document is None:
+            document = WsdlDocument(wsdl_path, ZeepTransport(), settings=ZEEP_SETTINGS)
+            wsdl_documents[wsdl_path] = document
+            logger.debug(f"WSDL geparst und gecacht: {wsdl_path}")
+        return document
+
+
+def get_onvif_transport(host, port):
+    """Gibt den zeep Transport einer Kamera zurück (eine requests.Session mit Keep-Alive pro Kamera)"""
+    key = (host, int(port))
+    with onvif_cache_lock:
+        transport = onvif_transports.get(key)
+        if transport is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            # Begrenzter Timeout, damit halb-offene Hosts keinen Worker blockieren
+            transport = ZeepTransport(session=session, timeout=SOAP_TIMEOUT, operation_timeout=SOAP_TIMEOUT)
+            onvif_transports[key] = transport
+        return transport
+
+
+class CachedONVIFCamera(ONVIFCamera):
+    """ONVIFCamera, deren Services geteilte WSDL-Dokumente und die gepoolte Session der Kamera verwenden"""
+    
+    def create_onvif_service(self, name, from_template=True, portType=None):
+        name = name.lower()
+        xaddr, wsdl_file, binding_name = self.get_definition(name, portType)
+        
+        with self.services_lock:
+            wsse = UsernameDigestTokenDtDiff(self.user, self.passwd, dt_diff=self.dt_diff, use_digest=self.encrypt)
+            zeep_client = ZeepClient(wsdl=get_wsdl_document(wsdl_file), wsse=wsse,
+                                     transport=self.transport, settings=ZEEP_SETTINGS)
+            service = ONVIFService(xaddr, self.user, self.passwd,
+                                   wsdl_file, self.encrypt,
+                                   self.daemon, zeep_client=zeep_client,
+                                   no_cache=self.no_cache,
+                                   portType=portType,
+                                   dt_diff=self.dt_diff,
+                                   binding_name=binding_name,
+                                   transport=self.transport)
+            
+            self.services[name] = service
+            setattr(self, name, service)
+        
+        return service
+
+
+def get_onvif_camera(host, port, username, password):
+    """Gibt ein (gecachtes) ONVIF-Kamera-Objekt zurück
+    Bekannte Kameras werden wiederverwendet, neue mit geteilten WSDLs und gepoolter Session erstellt"""
+    key = (host, int(port), username, password)
+    with onvif_cache_lock:
+        camera = onvif_cameras.get(key)
+    if camera is not None:
+        return camera
+    
+    camera = CachedONVIFCamera(host, port, username, password, transport=get_onvif_transport(host, port))
+    with onvif_cache_lock:
+        onvif_cameras[key] = camera
+    return camera
+
+
+def evict_onvif_camera(host, port):
+    """Entfernt gecachte Kamera-Objekte und die HTTP-Session eines Hosts (z.B. nach Fehlern)"""
+    with onvif_cache_lock:
+        for key in [k for k in onvif_cameras if k[0] == host and k[1] == int(port)]:
+            del onvif_cameras[key]
+        transport = onvif_transports.pop((host, int(port)), None)
+    if transport is not None:
+        try:
+            transport.session.close()
+        except Exception:
+            pass
+
+
 def test_onvif_connection(host, port, username, password):
     """Testet ONVIF-Verbindung mit gegebenen Credentials"""
     try:
-        # Erstelle Camera mit kürzerem Timeout
-        camera = ONVIFCamera(host, port, username, password)
+        camera = get_onvif_camera(host, port, username, password)
         # Versuche Device-Info abzurufen (schneller Test)
         device_info = camera.devicemgmt.GetDeviceInformation()
         return True, camera, device_info
     except Exception as e:
         # Nur bei Debug-Level loggen, nicht bei jedem fehlgeschlagenen Versuch
+        evict_onvif_camera(host, port)
         return False, None, None
 
 
-def get_stream_uri(camera, username, password, use_sub_stream=False):
-    """Holt die RTSP-Streaming-URL direkt von der ONVIF-Kamera über die Media Service API
-    use_sub_stream=True: Wählt das Profil mit der niedrigsten Auflösung (Sub-Stream) für Live-Vorschau
-    use_sub_stream=False: Wählt das Profil mit der höchsten Auflösung (Main-Stream) für Aufnahmen"""
+def _extract_encoder_info(entry, video_config):
+    """Überträgt Auflösung, Codec, Framerate und Bitrate einer VideoEncoderConfiguration in den Katalog-Eintrag"""
+    if video_config is None:
+        return
     try:
-        # Erstelle Media Service (bereits authentifiziert über camera-Objekt)
-        media_service = camera.create_media_service()
-        
-        # Hole alle Profile von der ONVIF-Kamera
-        profiles = media_service.GetProfiles()
-        
-        if not profiles or len(profiles) == 0:
-            logger.warning("Keine Profile von ONVIF-Kamera gefunden")
-            return None
-        
-        # Finde das Profil mit der höchsten oder niedrigsten Auflösung je nach use_sub_stream
-        best_profile = None
-        if use_sub_stream:
-            # Suche niedrigste Auflösung (Sub-Stream)
-            min_resolution = float('inf')
-            for profile in profiles:
-                try:
-                    video_config = None
-                    try:
-                        if hasattr(profile, 'VideoEncoderConfiguration') and profile.VideoEncoderConfiguration:
-                            video_config_token = profile.VideoEncoderConfiguration.token
-                            video_config = media_service.GetVideoEncoderConfiguration({'ConfigurationToken': video_config_token})
-                    except Exception as e:
-                        logger.debug(f"Konnte VideoEncoderConfiguration nicht holen: {e}")
-                        continue
-                    
-                    if video_config:
-                        width = 0
-                        height = 0
-                        try:
-                            if hasattr(video_config, 'Resolution'):
-                                res = video_config.Resolution
-                                if hasattr(res, 'Width'):
-                                    width = int(res.Width) if res.Width else 0
-                                if hasattr(res, 'Height'):
-                                    height = int(res.Height) if res.Height else 0
-                        except Exception as e:
-                            logger.debug(f"Konnte Resolution nicht extrahieren: {e}")
-                        
-                        if width > 0 and height > 0:
-                            resolution = width * height
-                            if resolution < min_resolution:
-                                min_resolution = resolution
-                                best_profile = profile
-                                logger.debug(f"Neues bestes Profil (niedrigste Auflösung) gefunden: {width}x{height} (Auflösung: {resolution})")
-                except Exception as e:
-                    logger.debug(f"Fehler beim Prüfen des Profils: {e}")
-                    continue
-            
-            if best_profile is None:
-                logger.info("Konnte Auflösungen nicht ermitteln, verwende letztes Profil (meist Sub-Stream)")
-                best_profile = profiles[-1] if len(profiles) > 1 else profiles[0]
-            else:
-                logger.info(f"Verwende Profil mit niedrigster Auflösung: {min_resolution} Pixel (Sub-Stream)")
-        else:
-            # Suche höchste Auflösung (Main-Stream)
-            max_resolution = 0
-            for profile in profiles:
-                try:
-                    video_config = None
-                    try:
-                        if hasattr(profile, 'VideoEncoderConfiguration') and profile.VideoEncoderConfiguration:
-                            video_config_token = profile.VideoEncoderConfiguration.token
-                            video_config = media_service.GetVideoEncoderConfiguration({'ConfigurationToken': video_config_token})
-                    except Exception as e:
-                        logger.debug(f"Konnte VideoEncoderConfiguration nicht holen: {e}")
-                        continue
-                    
-                    if video_config:
-                        width = 0
-                        height = 0
-                        try:
-                            if hasattr(video_config, 'Resolution'):
-                                res = video_config.Resolution
-                                if hasattr(res, 'Width'):
-                                    width = int(res.Width) if res.Width else 0
-                                if hasattr(res, 'Height'):
-                                    height = int(res.Height) if res.Height else 0
-                        except Exception as e:
-                            logger.debug(f"Konnte Resolution nicht extrahieren: {e}")
-                        
-                        if width > 0 and height > 0:
-                            resolution = width * height
-                            if resolution > max_resolution:
-                                max_resolution = resolution
-                                best_profile = profile
-                                logger.debug(f"Neues bestes Profil (höchste Auflösung) gefunden: {width}x{height} (Auflösung: {resolution})")
-                except Exception as e:
-                    logger.debug(f"Fehler beim Prüfen des Profils: {e}")
-                    continue
-            
-            if best_profile is None:
-                logger.info("Konnte Auflösungen nicht ermitteln, verwende erstes Profil (meist Main-Stream)")
-                best_profile = profiles[0]
-            else:
-                logger.info(f"Verwende Profil mit höchster Auflösung: {max_resolution} Pixel (Main-Stream)")
-        
-        profile = best_profile
-        
-        # Versuche StreamSetup über zeep_client zu erstellen (aus dem ONVIF Schema)
+        res = getattr(video_config, 'Resolution', None)
+        if res is not None:
+            entry['width'] = int(res.Width) if getattr(res, 'Width', None) else 0
+            entry['height'] = int(res.Height) if getattr(res, 'Height', None) else 0
+        encoding = getattr(video_config, 'Encoding', None)
+        if encoding:
+            entry['encoding'] = str(encoding)
+        rate_control = getattr(video_config, 'RateControl', None)
+        if rate_control is not None:
+            if getattr(rate_control, 'FrameRateLimit', None):
+                entry['framerate'] = int(rate_control.FrameRateLimit)
+            if getattr(rate_control, 'BitrateLimit', None):
+                entry['bitrate'] = int(rate_control.BitrateLimit)
+    except Exception as e:
+        logger.debug(f"Konnte Encoder-Informationen nicht extrahieren: {e}")
+
+
+def get_profile_catalog(camera):
+    """Holt alle Media-Profile einer ONVIF-Kamera in einem Durchgang
+    Gibt {'media_service': ..., 'profiles': [{'token', 'name', 'width', 'height', 'encoding', 'framerate', 'bitrate'}]} zurück
+    GetProfiles liefert die Encoder-Konfiguration meist bereits mit - GetVideoEncoderConfiguration
+    wird nur aufgerufen, wenn die Auflösung im Profil fehlt"""
+    media_service = camera.create_media_service()
+    profiles = media_service.GetProfiles()
+    
+    if not profiles:
+        logger.warning("Keine Profile von ONVIF-Kamera gefunden")
+        return None
+    
+    entries = []
+    for profile in profiles:
+        entry = {
+            'token': profile.token,
+            'name': getattr(profile, 'Name', None),
+            'width': 0,
+            'height': 0,
+            'encoding': None,
+            'framerate': None,
+            'bitrate': None
+        }
+        video_config = getattr(profile, 'VideoEncoderConfiguration', None)
+        if video_config is not None and getattr(video_config, 'Resolution', None) is None:
+            try:
+                video_config = media_service.GetVideoEncoderConfiguration({'ConfigurationToken': video_config.token})
+            except Exception as e:
+                logger.debug(f"Konnte VideoEncoderConfiguration nicht holen: {e}")
+                video_config = None
+        _extract_encoder_info(entry, video_config)
+        entries.append(entry)
+    
+    return {'media_service': media_service, 'profiles': entries}
+
+
+def _profile_pixels(entry):
+    return entry['width'] * entry['height']
+
+
+def select_highest_profile(profiles, target=None):
+    """Profil mit der höchsten Auflösung (Main-Stream), Fallback: erstes Profil"""
+    known = [p for p in profiles if _profile_pixels(p) > 0]
+    if not known:
+        return profiles[0]
+    return max(known, key=_profile_pixels)
+
+
+def select_lowest_profile(profiles, target=None):
+    """Profil mit der niedrigsten Auflösung (Sub-Stream), Fallback: letztes Profil"""
+    known = [p for p in profiles if _profile_pixels(p) > 0]
+    if not known:
+        return profiles[-1]
+    return min(known, key=_profile_pixels)
+
+
+def select_closest_profile(profiles, target=None):
+    """Profil mit der Auflösung am nächsten an target=(Breite, Höhe)"""
+    known = [p for p in profiles if _profile_pixels(p) > 0]
+    if not known or not target:
+        return select_highest_profile(profiles)
+    target_pixels = target[0] * target[1]
+    return min(known, key=lambda p: abs(_profile_pixels(p) - target_pixels))
+
+
+# Auswahl-Strategien für Profile - eigene Strategien können hier registriert werden
+PROFILE_SELECTION_POLICIES = {
+    'highest': select_highest_profile,
+    'lowest': select_lowest_profile,
+    'closest': select_closest_profile
+}
+
+
+def select_profile(catalog, policy='highest', target=None):
+    """Wählt ein Profil aus dem Katalog nach Strategie (Name aus PROFILE_SELECTION_POLICIES oder Funktion)"""
+    select = PROFILE_SELECTION_POLICIES[policy] if isinstance(policy, str) else policy
+    profile = select(catalog['profiles'], target)
+    logger.debug(f"Profil gewählt ({policy}): {profile['token']} {profile['width']}x{profile['height']} {profile['encoding']}")
+    return profile
+
+
+def _add_rtsp_credentials(stream_url, username, password):
+    """Stellt sicher, dass Credentials in der RTSP-URL enthalten sind"""
+    if stream_url and stream_url.startswith('rtsp://'):
+        from urllib.parse import urlunparse
+        parsed = urlparse(stream_url)
+        
+        # Wenn keine Credentials in der URL sind, füge sie hinzu
+        if not parsed.username:
+            # Erstelle neue URL mit Credentials
+            netloc = f"{username}:{password}@{parsed.hostname}"
+            if parsed.port:
+                netloc += f":{parsed.port}"
+            new_parsed = parsed._replace(netloc=netloc)
+            stream_url = urlunparse(new_parsed)
+            logger.debug(f"Credentials zur RTSP-URL hinzugefügt")
+    return stream_url
+
+
+def _strip_rtsp_credentials(stream_url):
+    """Entfernt Benutzername/Passwort aus einer RTSP-URL (für die Speicherung auf Platte)"""
+    if stream_url and stream_url.startswith('rtsp://'):
+        from urllib.parse import urlunparse
+        parsed = urlparse(stream_url)
+        if parsed.username is not None:
+            netloc = parsed.hostname
+            if parsed.port:
+                netloc += f":{parsed.port}"
+            stream_url = urlunparse(parsed._replace(netloc=netloc))
+    return stream_url
+
+
+def resolve_stream_uris(catalog, tokens, username, password):
+    """Holt die RTSP-URLs für mehrere Profile in einem Durchgang
+    Jedes Profil wird nur einmal abgefragt; gibt {token: stream_url} zurück"""
+    media_service = catalog['media_service']
+    
+    # Versuche StreamSetup über zeep_client zu erstellen (aus dem ONVIF Schema)
+    try:
+        # StreamSetup ist im ONVIF Schema (tt:) definiert, nicht im Media Service Namespace
+        zeep_client = media_service.zeep_client
+        stream_setup_type = zeep_client.get_type('ns0:StreamSetup')
+        transport_type = zeep_client.get_type('ns0:Transport')
+        
+        # Erstelle Transport-Objekt
+        transport = transport_type()
+        transport.Protocol = 'RTSP'
+        
+        # Erstelle StreamSetup-Objekt
+        stream_setup = stream_setup_type()
+        stream_setup.Stream = 'RTP-Unicast'
+        stream_setup.Transport = transport
+    except Exception as e_setup:
+        # Fallback: Dictionary-Struktur
+        logger.debug(f"StreamSetup-Objekt-Erstellung fehlgeschlagen, verwende Dictionary: {e_setup}")
+        stream_setup = {
+            'Stream': 'RTP-Unicast',
+            'Transport': {
+                'Protocol': 'RTSP'
+            }
+        }
+    
+    uris = {}
+    for token in tokens:
+        if token in uris:
+            continue
         try:
-            # StreamSetup ist im ONVIF Schema (tt:) definiert, nicht im Media Service Namespace
-            zeep_client = media_service.zeep_client
-            stream_setup_type = zeep_client.get_type('ns0:StreamSetup')
-            transport_type = zeep_client.get_type('ns0:Transport')
-            
-            # Erstelle Transport-Objekt
-            transport = transport_type()
-            transport.Protocol = 'RTSP'
-            
-            # Erstelle StreamSetup-Objekt
-            stream_setup = stream_setup_type()
-            stream_setup.Stream = 'RTP-Unicast'
-            stream_setup.Transport = transport
-            
-            # Rufe GetStreamUri von der ONVIF-Kamera auf - gibt RTSP-URL zurück
-            uri = media_service.GetStreamUri({
-                'ProfileToken': profile.token,
-                'StreamSetup': stream_setup
-            })
-        except Exception as e_setup:
-            # Fallback: Versuche mit Dictionary-Struktur
-            logger.debug(f"StreamSetup-Objekt-Erstellung fehlgeschlagen, verwende Dictionary: {e_setup}")
             try:
+                # Rufe GetStreamUri von der ONVIF-Kamera auf - gibt RTSP-URL zurück
                 uri = media_service.GetStreamUri({
-                    'ProfileToken': profile.token,
-                    'StreamSetup': {
-                        'Stream': 'RTP-Unicast',
-                        'Transport': {
-                            'Protocol': 'RTSP'
-                        }
-                    }
+                    'ProfileToken': token,
+                    'StreamSetup': stream_setup
                 })
-            except Exception as e_dict:
+            except Exception as e_setup:
                 # Letzter Fallback: Versuche ohne StreamSetup (manche Kameras unterstützen das)
-                logger.debug(f"Dictionary-Ansatz fehlgeschlagen, versuche ohne StreamSetup: {e_dict}")
-                uri = media_service.GetStreamUri({'ProfileToken': profile.token})
-        
-        # Die RTSP-URL kommt direkt von der ONVIF-Kamera
-        stream_url = uri.Uri
-        logger.debug(f"RTSP-URL von ONVIF-Kamera erhalten: {stream_url}")
-        
-        # Stelle sicher, dass Credentials in der RTSP-URL enthalten sind
-        if stream_url and stream_url.startswith('rtsp://'):
-            from urllib.parse import urlparse, urlunparse
-            parsed = urlparse(stream_url)
+                logger.debug(f"GetStreamUri mit StreamSetup fehlgeschlagen, versuche ohne: {e_setup}")
+                uri = media_service.GetStreamUri({'ProfileToken': token})
             
-            # Wenn keine Credentials in der URL sind, füge sie hinzu
-            if not parsed.username:
-                # Erstelle neue URL mit Credentials
-                netloc = f"{username}:{password}@{parsed.hostname}"
-                if parsed.port:
-                    netloc += f":{parsed.port}"
-                new_parsed = parsed._replace(netloc=netloc)
-                stream_url = urlunparse(new_parsed)
-                logger.debug(f"Credentials zur RTSP-URL hinzugefügt")
+            # Die RTSP-URL kommt direkt von der ONVIF-Kamera
+            uris[token] = _add_rtsp_credentials(uri.Uri, username, password)
+            logger.debug(f"RTSP-URL von ONVIF-Kamera erhalten: {uris[token]}")
+        except Exception as e:
+            logger.error(f"Fehler beim Abrufen der Stream-URL per SOAP: {e}")
+            uris[token] = None
+    return uris
+
+
+def get_stream_uri(camera, username, password, use_sub_stream=False, return_token=False):
+    """Holt die RTSP-Streaming-URL direkt von der ONVIF-Kamera über die Media Service API
+    use_sub_stream=True: Wählt das Profil mit der niedrigsten Auflösung (Sub-Stream) für Live-Vorschau
+    use_sub_stream=False: Wählt das Profil mit der höchsten Auflösung (Main-Stream) für Aufnahmen
+    return_token=True: Gibt (stream_url, profile_token) zurück
+    Für Main- und Sub-Stream zusammen get_profile_catalog/resolve_stream_uris verwenden"""
+    try:
+        catalog = get_profile_catalog(camera)
+        if not catalog:
+            return (None, None) if return_token else None
+        
+        profile = select_profile(catalog, 'lowest' if use_sub_stream else 'highest')
+        stream_url = resolve_stream_uris(catalog, [profile['token']], username, password)[profile['token']]
         
+        if return_token:
+            return stream_url, profile['token']
         return stream_url
     except Exception as e:
         logger.error(f"Fehler beim Abrufen der Stream-URL per SOAP: {e}")
-        return None
+        return (None, None) if return_token else None
 
 
-def scan_camera(host, port, username, password):
-    """Scannt eine einzelne Kamera - nur wenn SOAP-Auth mit admin/123456 erfolgreich"""
+def scan_camera(host, port, username, password, check=True):
+    """Scannt eine einzelne Kamera - nur wenn SOAP-Auth mit admin/123456 erfolgreich
+    check=False: Port wurde bereits vom Port-Sweep als erreichbar bestätigt"""
     # Teste Port schnell
-    if not check_port(host, port, timeout=0.3):
+    if check and not check_port(host, port):
         return None
     
     # Teste ONVIF-Verbindung per SOAP mit admin/123456
@@ -1300,11 +2083,24 @@ def scan_camera(host, port, username, password):
         return None
     
     try:
-        # Hole Main-Stream URL per SOAP für Aufnahmen (höchste Auflösung)
-        stream_url = get_stream_uri(camera, username, password, use_sub_stream=False)
+        # Profile einmal abrufen, Main- und Sub-Stream daraus auswählen
+        catalog = get_profile_catalog(camera)
+        if not catalog:
+            logger.debug(f"Keine Profile für {host}:{port} - Kamera wird nicht angezeigt")
+            return None
         
-        # Hole Sub-Stream URL per SOAP für Live-Vorschau (niedrigste Auflösung)
-        live_stream_url = get_stream_uri(camera, username, password, use_sub_stream=True)
+        # Main-Stream für Aufnahmen, Sub-Stream für Live-Vorschau
+        main_profile = select_profile(catalog, MAIN_STREAM_POLICY, MAIN_STREAM_TARGET)
+        sub_profile = select_profile(catalog, SUB_STREAM_POLICY, SUB_STREAM_TARGET)
+        main_token = main_profile['token']
+        sub_token = sub_profile['token']
+        logger.info(f"Main-Stream Profil: {main_profile['width']}x{main_profile['height']}, "
+                    f"Sub-Stream Profil: {sub_profile['width']}x{sub_profile['height']}")
+        
+        # Beide RTSP-URLs in einem Durchgang abrufen
+        uris = resolve_stream_uris(catalog, [main_token, sub_token], username, password)
+        stream_url = uris.get(main_token)
+        live_stream_url = uris.get(sub_token)
         
         # Wenn keine Stream-URL abgerufen werden konnte, Kamera nicht anzeigen
         if not stream_url:
@@ -1314,6 +2110,7 @@ def scan_camera(host, port, username, password):
         # Verwende Sub-Stream als Fallback für Live-Vorschau falls verfügbar
         if not live_stream_url:
             live_stream_url = stream_url
+            sub_token = main_token
         
         # Hole Device-Informationen
         device_name = f"Kamera {host}"
@@ -1337,6 +2134,11 @@ def scan_camera(host, port, username, password):
             'name': device_name,
             'stream_url': stream_url,  # Main-Stream für Aufnahmen
             'live_stream_url': live_stream_url,  # Sub-Stream für Live-Vorschau
+            'main_profile_token': main_token,
+            'sub_profile_token': sub_token,
+            'profiles': [dict(p) for p in catalog['profiles']],
+            'last_seen': datetime.now().isoformat(),
+            'online': True,
             'device_info': device_info
         }
         
@@ -1351,91 +2153,441 @@ def scan_camera(host, port, username, password):
         return None
 
 
-def scan_network(username=None, password=None, ports=[888, 835]):
-    """Scannt das Netzwerk nach ONVIF-Kameras"""
-    global found_cameras, scan_in_progress, camera_username, camera_password
-    
-    # Verwende globale Credentials falls nicht übergeben
-    if username is None:
-        with credentials_lock:
-            username = camera_username
-    if password is None:
-        with credentials_lock:
-            password = camera_password
+def load_camera_registry():
+    """Lädt die zuletzt gefundenen Kameras aus cameras.json
+    Die Stream-URLs werden ohne Credentials gespeichert und hier mit den aktuellen Login-Daten ergänzt"""
+    if not os.path.exists(CAMERA_REGISTRY_FILE):
+        return []
     
-    # Prüfe ob bereits ein Scan läuft
-    with scan_lock:
-        if scan_in_progress:
-            logger.warning("Scan läuft bereits, überspringe...")
-            return found_cameras
-        
-        scan_in_progress = True
+    with credentials_lock:
+        username = camera_username
+        password = camera_password
     
     try:
-        found_cameras = []
-        
-        network_base = get_local_network()
-        logger.info(f"Scanne Netzwerk {network_base}.0/24 auf Ports {ports}...")
-        
-        # Erstelle Liste aller zu testenden Hosts
-        hosts_to_scan = []
-        for i in range(1, 255):
-            for port in ports:
-                hosts_to_scan.append((f"{network_base}.{i}", port))
-        
-        # Scanne parallel mit ThreadPoolExecutor - deutlich mehr Worker für schnelleren Scan
-        with ThreadPoolExecutor(max_workers=100) as executor:
-            futures = {
-                executor.submit(scan_camera, host, port, username, password): (host, port)
-                for host, port in hosts_to_scan
-            }
-            
-            completed = 0
-            total = len(futures)
-            for future in as_completed(futures):
-                completed += 1
-                if completed % 50 == 0:
-                    logger.info(f"Scan Fortschritt: {completed}/{total} ({completed*100//total}%)")
-                result = future.result()
-                if result:
-                    found_cameras.append(result)
-        
-        logger.info(f"Scan abgeschlossen. {len(found_cameras)} Kamera(s) gefunden.")
-        
-        # Starte automatisch Aufnahmen für alle gefundenen Kameras
-        if found_cameras:
-            logger.info("Starte automatisch Aufnahmen für alle gefundenen Kameras...")
-            for idx, camera in enumerate(found_cameras):
-                # Prüfe ob bereits eine Aufnahme läuft
-                if idx in recording_status and recording_status[idx].get('recording', False):
-                    logger.info(f"Aufnahme läuft bereits für Kamera {idx} ({camera.get('host')}:{camera.get('port')}), überspringe...")
-                    continue
-                
-                try:
-                    success, message = start_recording(idx)
-                    if success:
-                        logger.info(f"Aufnahme gestartet für Kamera {idx}: {camera.get('host')}:{camera.get('port')}")
-                    else:
-                        logger.warning(f"Konnte Aufnahme nicht starten für Kamera {idx}: {message}")
-                except Exception as e:
-                    logger.error(f"Fehler beim Starten der Aufnahme für Kamera {idx}: {e}")
+        with registry_lock:
+            with open(CAMERA_REGISTRY_FILE, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
         
-        return found_cameras
-    finally:
-        # Setze Scan-Status zurück
-        with scan_lock:
-            scan_in_progress = False
+        cameras = []
+        for entry in entries.get('cameras', []):
+            if not entry.get('host') or not entry.get('stream_url'):
+                continue
+            camera = {field: entry.get(field) for field in REGISTRY_FIELDS}
+            camera['live_stream_url'] = camera['live_stream_url'] or camera['stream_url']
+            for field in ('stream_url', 'live_stream_url'):
+                camera[field] = _add_rtsp_credentials(camera[field], username, password)
+            camera['device_info'] = None
+            camera['online'] = None  # Unbekannt bis zur Revalidierung
+            cameras.append(camera)
+        
+        logger.info(f"Kamera-Registry geladen: {len(cameras)} Kamera(s)")
+        return cameras
+    except Exception as e:
+        logger.error(f"Fehler beim Laden der Kamera-Registry: {e}")
+        return []
 
 
-@app.route('/')
-def index():
-    """Hauptseite"""
-    return render_template_string(HTML_TEMPLATE, cameras=found_cameras)
+def save_camera_registry(cameras):
+    """Speichert die gefundenen Kameras in cameras.json (atomar über temporäre Datei)
+    Credentials werden aus den Stream-URLs entfernt - sie stehen nur in config.json"""
+    try:
+        entries = []
+        for camera in cameras:
+            entry = {field: camera.get(field) for field in REGISTRY_FIELDS}
+            for field in ('stream_url', 'live_stream_url'):
+                entry[field] = _strip_rtsp_credentials(entry[field])
+            entries.append(entry)
+        with registry_lock:
+            temp_file = CAMERA_REGISTRY_FILE + '.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({'cameras': entries}, f, indent=2, ensure_ascii=False)
+            os.replace(temp_file, CAMERA_REGISTRY_FILE)
+        logger.debug(f"Kamera-Registry gespeichert: {len(entries)} Kamera(s)")
+        return True
+    except Exception as e:
+        logger.error(f"Fehler beim Speichern der Kamera-Registry: {e}")
+        return False
 
 
-@app.route('/scan', methods=['POST'])
-def scan():
-    """Startet den Netzwerk-Scan"""
+def merge_found_cameras(cameras, mark_missing_offline=False):
+    """Übernimmt Scan-Ergebnisse in found_cameras, ohne bestehende Indizes zu verschieben
+    Bekannte Kameras (host, port) werden aktualisiert, neue angehängt. Gibt die Indizes der
+    übergebenen Kameras zurück. Aufnahmen mit geänderter Main-Stream URL werden neu gestartet"""
+    indices = []
+    restart = []
+    with cameras_lock:
+        positions = {(c['host'], c['port']): i for i, c in enumerate(found_cameras)}
+        for camera in cameras:
+            idx = positions.get((camera['host'], camera['port']))
+            if idx is None:
+                found_cameras.append(camera)
+                idx = len(found_cameras) - 1
+                positions[(camera['host'], camera['port'])] = idx
+                logger.info(f"Neue Kamera {idx}: {camera['host']}:{camera['port']}")
+            else:
+                existing = found_cameras[idx]
+                if (existing.get('stream_url') != camera.get('stream_url')
+                        and recording_status.get(idx, {}).get('recording', False)):
+                    restart.append(idx)
+                existing.update(camera)
+            indices.append(idx)
+        
+        if mark_missing_offline:
+            seen = set(indices)
+            for idx, camera in enumerate(found_cameras):
+                if idx not in seen:
+                    camera['online'] = False
+    
+    for idx in restart:
+        logger.info(f"Stream-URL geändert für Kamera {idx}, starte Aufnahme neu")
+        stop_recording(idx)
+        start_recording(idx)
+    return indices
+
+
+def revalidate_camera(camera_index, username, password):
+    """Prüft eine Kamera aus der Registry per ONVIF und aktualisiert ihre Daten direkt im Eintrag"""
+    camera = found_cameras[camera_index]
+    result = scan_camera(camera['host'], camera['port'], username, password)
+    if not result:
+        camera['online'] = False
+        logger.warning(f"Kamera aus Registry nicht erreichbar: {camera['host']}:{camera['port']}")
+        return False
+    
+    merge_found_cameras([result])
+    return True
+
+
+def revalidate_registry():
+    """Hintergrund-Revalidierung der aus der Registry geladenen Kameras
+    Ist keine Kamera mehr erreichbar, wird ein vollständiger Netzwerk-Scan durchgeführt"""
+    with credentials_lock:
+        username = camera_username
+        password = camera_password
+    
+    cameras = list(found_cameras)
+    if not cameras:
+        return
+    
+    logger.info(f"Revalidiere {len(cameras)} Kamera(s) aus der Registry...")
+    with ThreadPoolExecutor(max_workers=min(ONVIF_MAX_WORKERS, len(cameras))) as executor:
+        results = list(executor.map(lambda idx: revalidate_camera(idx, username, password), range(len(cameras))))
+    
+    valid = sum(1 for ok in results if ok)
+    logger.info(f"Registry-Revalidierung abgeschlossen: {valid}/{len(cameras)} Kamera(s) erreichbar")
+    
+    if valid:
+        save_camera_registry(found_cameras)
+    else:
+        logger.info("Keine Registry-Kamera erreichbar, starte vollständigen Netzwerk-Scan...")
+        try:
+            stop_recordings(list(recording_status.keys()))
+        except Exception:
+            pass
+        scan_network()
+
+
+def start_camera_recording(idx):
+    """Startet automatisch die Aufnahme für eine Kamera, falls noch keine läuft"""
+    camera = found_cameras[idx]
+    
+    # Prüfe ob bereits eine Aufnahme läuft
+    if idx in recording_status and recording_status[idx].get('recording', False):
+        logger.info(f"Aufnahme läuft bereits für Kamera {idx} ({camera.get('host')}:{camera.get('port')}), überspringe...")
+        return
+    
+    try:
+        success, message = start_recording(idx)
+        if success:
+            logger.info(f"Aufnahme gestartet für Kamera {idx}: {camera.get('host')}:{camera.get('port')}")
+        else:
+            logger.warning(f"Konnte Aufnahme nicht starten für Kamera {idx}: {message}")
+    except Exception as e:
+        logger.error(f"Fehler beim Starten der Aufnahme für Kamera {idx}: {e}")
+
+
+def start_all_recordings():
+    """Startet automatisch Aufnahmen für alle bekannten Kameras (außer als offline erkannte)"""
+    logger.info("Starte automatisch Aufnahmen für alle gefundenen Kameras...")
+    indices = [idx for idx, camera in enumerate(list(found_cameras)) if camera.get('online') is not False]
+    if not indices:
+        return
+    # Stream öffnen/prüfen dauert pro Kamera einige Sekunden - alle gleichzeitig starten
+    with ThreadPoolExecutor(max_workers=min(ONVIF_MAX_WORKERS, len(indices))) as executor:
+        list(executor.map(start_camera_recording, indices))
+
+
+def discover_sweep_targets(ports, networks, on_open=None):
+    """Ermittelt erreichbare (host, port)-Paare per asyncio Port-Sweep über alle CIDR-Bereiche"""
+    logger.info(f"Scanne Netzwerk(e) {', '.join(networks)} auf Ports {ports}...")
+    
+    # Erstelle Liste aller zu testenden Hosts
+    hosts_to_scan = build_sweep_targets(networks, ports)
+    
+    sweep_start = time.time()
+    open_hosts = sweep_ports(hosts_to_scan, on_open=on_open)
+    logger.info(f"Port-Sweep abgeschlossen in {time.time() - sweep_start:.2f}s: "
+                f"{len(open_hosts)}/{len(hosts_to_scan)} erreichbar")
+    return open_hosts
+
+
+def iter_probe_onvif_hosts(discover, username, password):
+    """Prüft erreichbare Hosts per ONVIF/SOAP und liefert jede Kamera, sobald sie bestätigt ist
+    discover(on_open) ruft on_open(host, port) für jeden erreichbaren Host auf - die ONVIF-Prüfung
+    startet sofort, nicht erst nach Ende der Erkennung"""
+    result_queue = queue.Queue()
+    submitted = [0]
+    executor = ThreadPoolExecutor(max_workers=ONVIF_MAX_WORKERS)
+    
+    def on_open(host, port):
+        future = executor.submit(scan_camera, host, port, username, password, False)
+        future.add_done_callback(result_queue.put)
+        submitted[0] += 1
+    
+    def run_discovery():
+        try:
+            discover(on_open)
+        except Exception as e:
+            logger.error(f"Fehler bei der Kamera-Erkennung: {e}")
+        finally:
+            result_queue.put(None)  # Erkennung abgeschlossen, alle Prüfungen sind eingereicht
+    
+    threading.Thread(target=run_discovery, daemon=True).start()
+    
+    discovery_done = False
+    received = 0
+    try:
+        while not discovery_done or received < submitted[0]:
+            future = result_queue.get()
+            if future is None:
+                discovery_done = True
+                continue
+            received += 1
+            try:
+                camera = future.result()
+            except Exception as e:
+                logger.error(f"Fehler bei der ONVIF-Prüfung: {e}")
+                continue
+            if camera:
+                yield camera
+    finally:
+        executor.shutdown(wait=False)
+
+
+def iter_scan_network(username=None, password=None, ports=None, mode=None, auto_record=True, networks=None):
+    """Generator: scannt das Netzwerk und liefert (index, kamera), sobald eine Kamera bestätigt ist
+    Jede Kamera wird sofort in found_cameras übernommen und (auto_record=True) ihre Aufnahme gestartet
+    ports/networks: None = Einstellung aus config.json bzw. automatisch aus den Interfaces"""
+    global scan_in_progress
+    
+    if ports is None:
+        ports = get_scan_ports()
+    if networks is None:
+        networks = get_scan_networks()
+    
+    # Verwende globale Credentials falls nicht übergeben
+    if username is None:
+        with credentials_lock:
+            username = camera_username
+    if password is None:
+        with credentials_lock:
+            password = camera_password
+    if mode is None:
+        with credentials_lock:
+            mode = discovery_mode
+    
+    # Prüfe ob bereits ein Scan läuft
+    with scan_lock:
+        if scan_in_progress:
+            logger.warning("Scan läuft bereits, überspringe...")
+            return
+        
+        scan_in_progress = True
+        scan_found.clear()
+    
+    seen = set()
+    completed = False
+    try:
+        found_targets = set()  # (host, port) der in diesem Scan bestätigten Kameras
+        covered = []  # Netze, die eine Stufe tatsächlich erreicht hat
+        stages = []
+        # WS-Discovery: ein Multicast-Probe statt Verbindungen zu allen Hosts×Ports
+        if mode in ('auto', 'ws-discovery'):
+            stages.append('ws-discovery')
+        # Port-Sweep: explizit gewählt, als Fallback wenn WS-Discovery nichts gefunden hat,
+        # oder für Bereiche außerhalb des lokalen Segments (dort kommt kein Multicast an)
+        if mode in ('auto', 'sweep'):
+            stages.append('sweep')
+        
+        for stage in stages:
+            if stage == 'ws-discovery':
+                stage_networks = get_local_networks()
+                discover = lambda on_open: [on_open(h, p) for h, p in discover_ws_targets()]
+            else:
+                stage_networks = networks
+                if mode == 'auto' and seen:
+                    stage_networks = get_remote_networks(networks, covered)
+                    if not stage_networks:
+                        continue
+                    logger.info(f"Port-Sweep für Netze außerhalb der WS-Discovery: {', '.join(stage_networks)}")
+                elif mode == 'auto':
+                    logger.info("WS-Discovery ohne Ergebnis, verwende Port-Sweep als Fallback")
+                
+                def discover(on_open, stage_networks=stage_networks):
+                    # Bereits per WS-Discovery bestätigte Kameras nicht erneut prüfen
+                    def on_new(host, port):
+                        if (host, port) not in found_targets:
+                            on_open(host, port)
+                    return discover_sweep_targets(ports, stage_networks, on_new)
+            covered.extend(stage_networks)
+            
+            for camera in iter_probe_onvif_hosts(discover, username, password):
+                # Kameraliste in-place aktualisieren - Indizes laufender Aufnahmen bleiben erhalten
+                idx = merge_found_cameras([camera])[0]
+                seen.add(idx)
+                found_targets.add((camera['host'], camera['port']))
+                # Aufnahme sofort starten, ohne auf die übrigen Hosts zu warten
+                if auto_record:
+                    threading.Thread(target=start_camera_recording, args=(idx,), daemon=True).start()
+                with scan_lock:
+                    scan_found.append((idx, found_cameras[idx]))
+                    listeners = list(scan_listeners)
+                for listener in listeners:
+                    listener('camera', (idx, found_cameras[idx]))
+                yield idx, found_cameras[idx]
+        
+        logger.info(f"Scan abgeschlossen. {len(seen)} Kamera(s) gefunden.")
+        
+        # Nur Kameras in Netzen, die dieser Scan erreicht hat, gelten als offline
+        with cameras_lock:
+            for idx, camera in enumerate(found_cameras):
+                if idx not in seen and host_in_networks(camera.get('host'), covered):
+                    camera['online'] = False
+        if seen:
+            save_camera_registry(found_cameras)
+        completed = True
+    finally:
+        # Setze Scan-Status zurück und melde allen angemeldeten Zuschauern das Ende
+        with scan_lock:
+            scan_in_progress = False
+            listeners = list(scan_listeners)
+            scan_listeners.clear()
+        for listener in listeners:
+            listener('done', {'success': completed, 'cameras': len(seen)})
+
+
+def scan_network(username=None, password=None, ports=None, mode=None, on_camera=None, auto_record=True, networks=None):
+    """Scannt das Netzwerk nach ONVIF-Kameras
+    mode: 'auto', 'ws-discovery' oder 'sweep' (None = Einstellung aus config.json)
+    on_camera(index, kamera) wird für jede Kamera aufgerufen, sobald sie bestätigt ist
+    Gibt die in diesem Scan gefundenen Kameras zurück; found_cameras wird in-place aktualisiert"""
+    if scan_in_progress:
+        logger.warning("Scan läuft bereits, überspringe...")
+        return found_cameras
+    
+    cameras = []
+    for idx, camera in iter_scan_network(username, password, ports, mode, auto_record, networks):
+        cameras.append(camera)
+        if on_camera is not None:
+            on_camera(idx, camera)
+    return cameras
+
+
+def check_camera_alive(camera, username, password):
+    """Günstige Lebenszeichen-Prüfung: TCP-Verbindung plus GetSystemDateAndTime per SOAP"""
+    if not check_port(camera['host'], camera['port']):
+        return False
+    try:
+        onvif_camera = get_onvif_camera(camera['host'], camera['port'], username, password)
+        onvif_camera.devicemgmt.GetSystemDateAndTime()
+        return True
+    except Exception:
+        evict_onvif_camera(camera['host'], camera['port'])
+        return False
+
+
+def check_known_cameras(username, password):
+    """Prüft alle bekannten Kameras parallel und aktualisiert ihren Online-Status in-place"""
+    cameras = list(found_cameras)
+    if not cameras:
+        return
+    
+    with ThreadPoolExecutor(max_workers=min(ONVIF_MAX_WORKERS, len(cameras))) as executor:
+        alive = list(executor.map(lambda c: check_camera_alive(c, username, password), cameras))
+    
+    for idx, (camera, is_alive) in enumerate(zip(cameras, alive)):
+        if is_alive:
+            camera['presence_failures'] = 0
+            camera['last_seen'] = datetime.now().isoformat()
+            if camera.get('online') is False:
+                logger.info(f"Kamera {idx} wieder online: {camera['host']}:{camera['port']}")
+                camera['online'] = True
+                if not recording_status.get(idx, {}).get('recording', False):
+                    start_recording(idx)
+            camera['online'] = True
+        else:
+            camera['presence_failures'] = camera.get('presence_failures', 0) + 1
+            if camera['presence_failures'] >= PRESENCE_FAILURE_THRESHOLD and camera.get('online') is not False:
+                logger.warning(f"Kamera {idx} offline: {camera['host']}:{camera['port']}")
+                camera['online'] = False
+
+
+def sweep_for_new_cameras(targets, username, password):
+    """Prüft einen kleinen Block bisher unbekannter Adressen und übernimmt neue Kameras"""
+    known = {(c['host'], c['port']) for c in found_cameras}
+    open_hosts = sweep_ports([t for t in targets if t not in known])
+    if not open_hosts:
+        return
+    
+    new_cameras = [c for c in (scan_camera(host, port, username, password, False) for host, port in open_hosts) if c]
+    if new_cameras:
+        indices = merge_found_cameras(new_cameras)
+        save_camera_registry(found_cameras)
+        for idx in indices:
+            if not recording_status.get(idx, {}).get('recording', False):
+                start_recording(idx)
+
+
+def presence_monitor_worker():
+    """Hintergrund-Thread: erkennt offline/online gehende Kameras innerhalb weniger Sekunden
+    und sucht langsam blockweise nach neuen Adressen, ohne die Kameraliste neu aufzubauen"""
+    sweep_targets = []
+    sweep_position = 0
+    while True:
+        time.sleep(PRESENCE_CHECK_INTERVAL)
+        try:
+            # Während eines vollständigen Scans nicht zusätzlich prüfen
+            if scan_in_progress:
+                continue
+            
+            with credentials_lock:
+                username = camera_username
+                password = camera_password
+            
+            check_known_cameras(username, password)
+            
+            # Nächsten Block des langsamen Sweeps prüfen
+            if sweep_position >= len(sweep_targets):
+                sweep_targets = build_sweep_targets(get_scan_networks(), get_scan_ports())
+                sweep_position = 0
+            batch = sweep_targets[sweep_position:sweep_position + PRESENCE_SWEEP_BATCH]
+            sweep_position += PRESENCE_SWEEP_BATCH
+            sweep_for_new_cameras(batch, username, password)
+        except Exception as e:
+            logger.error(f"Fehler im Präsenz-Monitor: {e}")
+
+
+@app.route('/')
+def index():
+    """Hauptseite"""
+    hls_available, _ = check_ffmpeg()
+    prewarm_live_grabbers()
+    return render_template_string(HTML_TEMPLATE, cameras=found_cameras, hls_available=hls_available)
+
+
+@app.route('/scan', methods=['POST'])
+def scan():
+    """Startet den Netzwerk-Scan"""
     try:
         cameras = scan_network()
         return {
@@ -1451,12 +2603,76 @@ def scan():
         }
 
 
+def camera_summary(idx, camera):
+    """JSON-taugliche Kurzinfo einer Kamera (für Scan-Events)"""
+    return {
+        'index': idx,
+        'host': camera.get('host'),
+        'port': camera.get('port'),
+        'name': camera.get('name'),
+        'online': camera.get('online')
+    }
+
+
+@app.route('/scan/stream')
+def scan_stream():
+    """Startet den Netzwerk-Scan und liefert jede gefundene Kamera sofort als Server-Sent Event
+    Läuft bereits ein Scan, wird die Verbindung an diesen angehängt: zuerst die bisher in diesem
+    Scan gefundenen Kameras, dann die weiteren - nie die Kameraliste früherer Scans"""
+    events = queue.Queue()
+    
+    def listener(event, data):
+        if event == 'camera':
+            events.put(('camera', camera_summary(*data)))
+        elif data['success']:
+            events.put(('done', {'success': True, 'cameras': data['cameras'],
+                                 'message': f"{data['cameras']} Kamera(s) gefunden"}))
+        else:
+            events.put(('done', {'success': False, 'message': 'Scan abgebrochen'}))
+    
+    with scan_lock:
+        running = scan_in_progress
+        for idx, camera in scan_found if running else []:
+            listener('camera', (idx, camera))
+        scan_listeners.append(listener)
+    
+    def run_scan():
+        # Findet scan_network inzwischen einen anderen laufenden Scan, meldet dieser das Ende
+        try:
+            scan_network()
+        except Exception as e:
+            logger.error(f"Fehler beim Scannen: {e}")
+            with scan_lock:
+                if listener in scan_listeners:
+                    scan_listeners.remove(listener)
+            events.put(('done', {'success': False, 'message': str(e)}))
+    
+    # Scan läuft unabhängig von der Verbindung weiter, auch wenn der Browser die Seite verlässt
+    if running:
+        logger.info("Scan läuft bereits, Verbindung wird an den laufenden Scan angehängt")
+    else:
+        threading.Thread(target=run_scan, daemon=True).start()
+    
+    def generate():
+        while True:
+            event, data = events.get()
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+            if event == 'done':
+                break
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+
 @app.route('/cameras')
 def cameras_json():
     """Gibt gefundene Kameras als JSON zurück"""
     return {'cameras': found_cameras}
 
 
+RECORDING_STAGING_DIR = '.laufend'  # Unterordner von aufnahmen/ für noch nicht abgeschlossene Segmente
+
+
 def ensure_recordings_dir():
     """Erstellt den aufnahmen-Ordner falls nicht vorhanden"""
     os.makedirs('aufnahmen', exist_ok=True)
@@ -1507,10 +2723,15 @@ def cleanup_old_recordings(max_age_hours=24):
                     except Exception as e:
                         logger.error(f"Fehler beim Löschen von {file_path}: {e}")
         
-        # Lösche leere Ordner
+        # Lösche leere Ordner (außer dem Staging-Ordner laufender Aufnahmen)
+        staging_root = os.path.join(aufnahmen_dir, RECORDING_STAGING_DIR)
         for root, dirs, files in os.walk(aufnahmen_dir, topdown=False):
+            if root.startswith(staging_root):
+                continue
             for dir_name in dirs:
                 dir_path = os.path.join(root, dir_name)
+                if dir_path == staging_root:
+                    continue
                 try:
                     if not os.listdir(dir_path):  # Ordner ist leer
                         os.rmdir(dir_path)
@@ -1540,9 +2761,10 @@ def cleanup_worker():
             time.sleep(3600)  # Warte weiterhin bei Fehler
 
 
-def get_recording_filename(camera_host, camera_port):
-    """Erstellt Dateinamen und Ordnerstruktur: aufnahmen/YYYY-MM-DD/HH-MM_HH-MM/IP_PORT_YYYY-MM-DD_HH-MM-SS.mp4"""
-    now = datetime.now()
+def get_recording_filename(camera_host, camera_port, start_time=None, create_dir=True):
+    """Erstellt Dateinamen und Ordnerstruktur: aufnahmen/YYYY-MM-DD/HH-MM_HH-MM/IP_PORT_YYYY-MM-DD_HH-MM-SS.mp4
+    start_time: Startzeit der Aufnahme (Standard: jetzt)"""
+    now = start_time or datetime.now()
     date_str = now.strftime('%Y-%m-%d')
     
     # Erstelle Uhrzeit-Bereich (Stundensegment): 14-00_15-00
@@ -1552,13 +2774,202 @@ def get_recording_filename(camera_host, camera_port):
     
     # Erstelle Ordnerstruktur: aufnahmen/YYYY-MM-DD/HH-MM_HH-MM/
     day_folder = os.path.join('aufnahmen', date_str, time_range)
-    os.makedirs(day_folder, exist_ok=True)
+    if create_dir:
+        os.makedirs(day_folder, exist_ok=True)
     
     timestamp = now.strftime('%Y-%m-%d_%H-%M-%S')
     filename = f"{camera_host}_{camera_port}_{timestamp}.mp4"
     return os.path.join(day_folder, filename)
 
 
+def get_segment_duration():
+    """Aktuelle Segment-Länge in Sekunden"""
+    with credentials_lock:
+        return segment_duration
+
+
+def get_segment_start(timestamp, duration=None):
+    """Beginn des Segments, in das timestamp fällt (Raster ab voller Stunde, z.B. 14:37:12 -> 14:30:00)"""
+    duration = duration or get_segment_duration()
+    seconds_into_hour = timestamp.minute * 60 + timestamp.second
+    return timestamp.replace(minute=0, second=0, microsecond=0) + timedelta(seconds=seconds_into_hour // duration * duration)
+
+
+def get_segment_filename(camera_host, camera_port, start_time):
+    """Freier Dateiname für ein Segment: Name nach tatsächlichem Aufnahme-Beginn (sekundengenau),
+    bei Namensgleichheit mit Zähler (_0, _1 ...)"""
+    filename = get_recording_filename(camera_host, camera_port, start_time)
+    base, ext = os.path.splitext(filename)
+    segment_index = 0
+    while os.path.exists(filename):
+        filename = f"{base}_{segment_index}{ext}"
+        segment_index += 1
+    return filename
+
+
+def find_segment_files(camera_host, camera_port, timestamp):
+    """Aufnahmen einer Kamera im Segment von timestamp - nur der berechnete Stunden-Ordner wird gelesen.
+    Gibt (segment_start, [Pfade]) nach Startzeit sortiert zurück; mehrere Pfade nur nach Neustart der
+    Aufnahme im selben Segment"""
+    segment_start = get_segment_start(timestamp)
+    folder = os.path.dirname(get_recording_filename(camera_host, camera_port, segment_start, create_dir=False))
+    prefix = f"{camera_host}_{camera_port}_"
+    try:
+        entries = os.listdir(folder)
+    except OSError:
+        return segment_start, []
+    files = []
+    for entry in entries:
+        if not entry.startswith(prefix) or not entry.endswith('.mp4'):
+            continue
+        start_time = parse_recording_start(entry)
+        if start_time is not None and get_segment_start(start_time) == segment_start:
+            files.append((start_time, os.path.join(folder, entry)))
+    return segment_start, [path for _, path in sorted(files)]
+
+
+def get_recording_staging_dir(camera_host, camera_port):
+    """Ordner, in den FFmpeg die laufenden Segmente schreibt (wird in der Aufnahmen-Liste ausgeblendet)"""
+    return os.path.join('aufnahmen', RECORDING_STAGING_DIR, f"{camera_host}_{camera_port}")
+
+
+def parse_recording_start(filename):
+    """Startzeit aus dem Dateinamen einer Aufnahme (IP_PORT_YYYY-MM-DD_HH-MM-SS[_N].mp4), None wenn nicht lesbar"""
+    parts = os.path.basename(filename).replace('.mp4', '').split('_')
+    if len(parts) > 4 and parts[-1].isdigit():
+        parts = parts[:-1]  # Zähler bei Namensgleichheit
+    if len(parts) < 4:
+        return None
+    try:
+        return datetime.strptime(f"{parts[-2]}_{parts[-1]}", "%Y-%m-%d_%H-%M-%S")
+    except ValueError:
+        return None
+
+
+def finalize_segment(camera_host, camera_port, staging_path):
+    """Verschiebt ein abgeschlossenes Segment an seinen endgültigen Platz (Ordner nach Startzeit)"""
+    if not os.path.exists(staging_path):
+        return None
+    
+    # Startzeit steht im Dateinamen (IP_PORT_YYYY-MM-DD_HH-MM-SS.mp4) und bleibt erhalten -
+    # nach einem Neustart mitten im Segment ist sie nicht der Segment-Beginn
+    start_time = parse_recording_start(staging_path)
+    if start_time is None:
+        start_time = datetime.fromtimestamp(os.path.getmtime(staging_path))
+    
+    final_path = get_segment_filename(camera_host, camera_port, start_time)
+    
+    try:
+        os.replace(staging_path, final_path)
+    except OSError as e:
+        logger.error(f"Konnte Segment nicht verschieben: {staging_path} -> {final_path}: {e}")
+        return None
+    
+    file_size = os.path.getsize(final_path)
+    if file_size < 1024:  # Weniger als 1KB = wahrscheinlich korrupt
+        logger.warning(f"Segment-Datei sehr klein ({file_size} bytes), möglicherweise korrupt: {final_path}")
+    else:
+        logger.info(f"Segment abgeschlossen: {final_path} ({file_size} bytes)")
+    return final_path
+
+
+def finalize_staged_segments(camera_host, camera_port):
+    """Übernimmt alle noch im Staging-Ordner liegenden Segmente (nach Stopp oder Absturz)
+    Gibt die endgültigen Pfade in zeitlicher Reihenfolge zurück"""
+    staging_dir = get_recording_staging_dir(camera_host, camera_port)
+    if not os.path.isdir(staging_dir):
+        return []
+    final_paths = []
+    for entry in sorted(os.listdir(staging_dir)):
+        if entry.endswith('.mp4'):
+            final_path = finalize_segment(camera_host, camera_port, os.path.join(staging_dir, entry))
+            if final_path:
+                final_paths.append(final_path)
+    return final_paths
+
+
+def get_current_staged_segment(camera_host, camera_port):
+    """Pfad des Segments, das FFmpeg gerade schreibt (neueste Datei im Staging-Ordner)"""
+    staging_dir = get_recording_staging_dir(camera_host, camera_port)
+    try:
+        files = [entry for entry in os.listdir(staging_dir) if entry.endswith('.mp4')]
+    except OSError:
+        return None
+    return os.path.join(staging_dir, max(files)) if files else None
+
+
+async def read_segment_list(stream, on_segment_complete):
+    """Liest die Segment-Liste von FFmpeg (CSV: datei,start,ende) und meldet jedes abgeschlossene Segment"""
+    try:
+        while True:
+            line = await stream.readline()
+            if not line:
+                break
+            entry = line.decode('utf-8', errors='replace').strip()
+            if not entry:
+                continue
+            filename = entry.rsplit(',', 2)[0].strip('"')
+            try:
+                on_segment_complete(os.path.basename(filename))
+            except Exception as e:
+                logger.error(f"Fehler beim Abschließen von Segment {filename}: {e}")
+    except (OSError, ValueError):
+        pass
+
+
+async def read_ffmpeg_progress(stream, label, on_progress):
+    """Liest stderr von FFmpeg fortlaufend (damit die Pipe nie voll läuft) und wertet die
+    -progress Ausgabe aus: Schlüssel=Wert-Zeilen, jeder Block endet mit progress=continue/end"""
+    progress = {}
+    try:
+        while True:
+            line = await stream.readline()
+            if not line:
+                break
+            message = line.decode('utf-8', errors='replace').strip()
+            key, separator, value = message.partition('=')
+            if separator and re.fullmatch(r'[a-z0-9_]+', key):
+                progress[key] = value.strip()
+                if key == 'progress':
+                    try:
+                        on_progress(progress)
+                    except Exception as e:
+                        logger.error(f"Fehler beim Auswerten des FFmpeg-Fortschritts ({label}): {e}")
+                    progress = {}
+            elif message:
+                logger.debug(f"FFmpeg ({label}): {message}")
+    except (OSError, ValueError):
+        pass
+
+
+def parse_ffmpeg_progress(progress):
+    """Wandelt einen -progress Block in Zahlen um; fehlende Werte und 'N/A' werden None"""
+    def number(key, suffix=''):
+        value = progress.get(key, 'N/A').strip()
+        if suffix and value.endswith(suffix):
+            value = value[:-len(suffix)]
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    
+    out_time_us = number('out_time_us')
+    total_size = number('total_size')
+    frame = number('frame')
+    drop_frames = number('drop_frames')
+    dup_frames = number('dup_frames')
+    return {
+        'frame': int(frame) if frame is not None else None,
+        'fps': number('fps'),
+        'speed': number('speed', 'x'),
+        'bitrate_kbps': number('bitrate', 'kbits/s'),
+        'total_size': int(total_size) if total_size is not None else None,
+        'out_time': round(out_time_us / 1000000, 2) if out_time_us is not None else None,
+        'drop_frames': int(drop_frames) if drop_frames is not None else 0,
+        'dup_frames': int(dup_frames) if dup_frames is not None else 0
+    }
+
+
 def start_recording(camera_index):
     """Startet die Aufnahme für eine Kamera - Thread-sicher"""
     if camera_index >= len(found_cameras):
@@ -1606,7 +3017,7 @@ def start_recording(camera_index):
         
         try:
             ensure_recordings_dir()
-            filename = get_recording_filename(host, port)
+            filename = get_recording_filename(host, port, datetime.now())
             
             # Öffne Video-Capture für Aufnahme
             cap = cv2.VideoCapture(stream_url)
@@ -1641,7 +3052,7 @@ def start_recording(camera_index):
             recording_status[camera_index] = {
                 'recording': True,
                 'writer': None,  # Wird im Thread erstellt (OpenCV)
-                'ffmpeg_process': None,  # Wird im Thread erstellt (FFmpeg)
+                'ffmpeg_process': None,  # Wird im Aufnahme-Supervisor erstellt (FFmpeg)
                 'filename': filename,
                 'cap': cap,
                 'start_time': datetime.now(),
@@ -1653,14 +3064,18 @@ def start_recording(camera_index):
             }
             recording_locks[camera_index] = threading.Lock()
             
-            # Starte Aufnahme-Thread (FFmpeg wenn verfügbar, sonst OpenCV)
+            # Starte Aufnahme (FFmpeg als Task im Supervisor-Loop wenn verfügbar, sonst OpenCV-Thread)
             if ffmpeg_avail:
-                thread = threading.Thread(target=record_camera_ffmpeg, args=(camera_index,), daemon=True)
+                # Die Capture wird nur für OpenCV gebraucht
+                cap.release()
+                recording_status[camera_index]['cap'] = None
+                asyncio.run_coroutine_threadsafe(record_camera_ffmpeg(camera_index), get_recorder_loop())
                 logger.info(f"Aufnahme mit FFmpeg (mit Audio) gestartet für Kamera {camera_index}")
             else:
                 thread = threading.Thread(target=record_camera_opencv, args=(camera_index,), daemon=True)
+                recording_status[camera_index]['thread'] = thread
+                thread.start()
                 logger.info(f"Aufnahme mit OpenCV (ohne Audio) gestartet für Kamera {camera_index}")
-            thread.start()
             
             logger.info(f"Aufnahme gestartet für Kamera {camera_index}: {filename}")
             return True, filename
@@ -1670,11 +3085,17 @@ def start_recording(camera_index):
             return False, str(e)
 
 
-def record_camera_ffmpeg(camera_index):
-    """Aufnahme-Thread für eine Kamera mit FFmpeg (unterstützt Audio)"""
+async def record_camera_ffmpeg(camera_index):
+    """Aufnahme einer Kamera mit FFmpeg (unterstützt Audio) - läuft als Task im Aufnahme-Supervisor
+    Reagiert sofort auf das Ende des Prozesses, prüft an jeder Segment-Grenze per Timer, ob FFmpeg
+    weiterschneidet, und wird über stop_event beendet"""
     status = recording_status.get(camera_index)
-    if not status:
+    if not status or not status['recording']:
         return
+    status['task'] = asyncio.current_task()
+    stop_event = asyncio.Event()
+    status['stop_event'] = stop_event
+    loop = asyncio.get_running_loop()
     
     camera = found_cameras[camera_index]
     stream_url = camera.get('stream_url')
@@ -1685,198 +3106,357 @@ def record_camera_ffmpeg(camera_index):
     ffmpeg_avail, ffmpeg_cmd = check_ffmpeg()
     if not ffmpeg_avail:
         logger.error("FFmpeg nicht verfügbar - verwende OpenCV ohne Audio")
-        # Fallback auf OpenCV
-        record_camera_opencv(camera_index)
+        # Fallback auf OpenCV (die Capture wurde für FFmpeg bereits geschlossen)
+        status['use_ffmpeg'] = False
+        cap = await loop.run_in_executor(None, cv2.VideoCapture, stream_url)
+        if stop_event.is_set() or not status['recording']:
+            cap.release()  # Während des Öffnens gestoppt
+            return
+        status['cap'] = cap
+        status['thread'] = threading.Thread(target=record_camera_opencv, args=(camera_index,), daemon=True)
+        status['thread'].start()
         return
     
     # Hole Aufnahme-Auflösung aus Status
     recording_width = status.get('recording_width', 1920)
     recording_height = status.get('recording_height', 1080)
+    original_width = status.get('original_width', recording_width * 2)
+    original_height = status.get('original_height', recording_height * 2)
+    scaling = recording_width < original_width or recording_height < original_height
+    
+    # Kopier-Modus: Video der Kamera unverändert übernehmen, nur bei Skalierung,
+    # ausdrücklichem 'transcode' oder nicht MP4-tauglichem Codec wird neu kodiert
+    with credentials_lock:
+        mode = record_mode
+    # ffprobe blockiert - im Thread-Pool des Loops ausführen, damit andere Kameras nicht warten
+    codecs = await loop.run_in_executor(None, probe_stream_codecs, stream_url, camera)
+    if stop_event.is_set() or not status['recording']:
+        # Während ffprobe gestoppt - FFmpeg gar nicht erst starten
+        logger.info(f"Aufnahme für Kamera {camera_index} vor dem Start von FFmpeg gestoppt")
+        status['filename'] = None  # Es wurde keine Datei angelegt
+        return
+    copy_video = mode == 'copy' and not scaling and codecs['video'] in COPY_VIDEO_CODECS
+    copy_audio = codecs['audio'] in COPY_AUDIO_CODECS
+    status['record_mode'] = 'copy' if copy_video else 'transcode'
+    if copy_video:
+        logger.info(f"Aufnahme ohne Neukodierung (Video {codecs['video']}, Audio {codecs['audio'] or 'unbekannt'}) für Kamera {camera_index}")
+    elif mode == 'copy':
+        reason = 'halbierte Auflösung' if scaling else f"Codec {codecs['video'] or 'unbekannt'}"
+        logger.info(f"Aufnahme wird neu kodiert ({reason}) für Kamera {camera_index}")
     
-    # Segmentierung: Neue Datei alle 10 Minuten
-    segment_duration = 600  # 10 Minuten in Sekunden
-    segment_start_time = datetime.now()
+    # Segmentierung: ein langlebiger FFmpeg-Prozess schneidet selbst an den Uhrzeit-Grenzen
+    # am nächsten Keyframe (Segment-Muxer) - kein Neustart, keine Lücke, kein neuer RTSP-Handshake
+    segment_duration = get_segment_duration()
+    staging_dir = get_recording_staging_dir(host, port)
     current_process = None
-    current_filename = None
-    segment_index = 0
+    reader_tasks = []
+    finished_bytes = 0  # Größe der abgeschlossenen Segmente des aktuellen Prozesses
+    slow_since = None  # Seit wann FFmpeg langsamer als Echtzeit ist
+    last_progress = time.time()  # Letzte Fortschrittsmeldung (hängende Prozesse erkennen)
+    restarts = 0
+    expected_boundary = None  # Nächste Segment-Grenze, an der FFmpeg ein neues Segment beginnen muss
+    filename_pending = False  # Erstes Segment des Prozesses noch nicht angelegt
     
-    def create_new_segment():
-        """Erstellt ein neues Video-Segment mit FFmpeg"""
-        nonlocal current_process, current_filename, segment_start_time, segment_index
-        
-        # Stoppe alte Aufnahme
-        if current_process is not None:
+    # Reste eines abgebrochenen Laufs übernehmen
+    finalize_staged_segments(host, port)
+    
+    def on_segment_complete(staging_filename):
+        """Wird aufgerufen, sobald FFmpeg ein Segment abgeschlossen hat"""
+        nonlocal finished_bytes
+        final_path = finalize_segment(host, port, os.path.join(staging_dir, staging_filename))
+        if final_path:
+            status['last_segment'] = final_path
+            finished_bytes += os.path.getsize(final_path)
+        # Das nächste Segment hat FFmpeg bereits begonnen
+        current_segment = get_current_staged_segment(host, port)
+        if current_segment:
+            status['filename'] = current_segment
+    
+    def on_progress(progress):
+        """Wird für jeden -progress Block aufgerufen (ca. alle 0,5 s) und aktualisiert die Metriken"""
+        nonlocal slow_since, last_progress
+        last_progress = time.time()
+        metrics = parse_ffmpeg_progress(progress)
+        
+        # Der Segment-Muxer meldet keine Größe/Bitrate - aus den geschriebenen Dateien berechnen
+        if metrics['total_size'] is None:
+            current_segment = get_current_staged_segment(host, port)
             try:
-                # Sende 'q' Signal um FFmpeg sauber zu beenden
-                # Warte länger damit FFmpeg die Datei vollständig schließen kann
-                current_process.stdin.write(b'q\n')
-                current_process.stdin.flush()
-                current_process.wait(timeout=10)  # Mehr Zeit für sauberes Beenden
-            except subprocess.TimeoutExpired:
-                # Falls FFmpeg nicht sauber beendet, versuche terminate
-                logger.warning(f"FFmpeg beendete sich nicht sauber, verwende terminate")
-                try:
-                    current_process.terminate()
-                    current_process.wait(timeout=5)
-                except:
-                    try:
-                        current_process.kill()
-                    except:
-                        pass
-            except:
-                try:
-                    current_process.terminate()
-                    current_process.wait(timeout=2)
-                except:
-                    try:
-                        current_process.kill()
-                    except:
-                        pass
-            # Prüfe ob Datei existiert und nicht leer ist
-            if current_filename and os.path.exists(current_filename):
-                file_size = os.path.getsize(current_filename)
-                if file_size < 1024:  # Weniger als 1KB = wahrscheinlich korrupt
-                    logger.warning(f"Segment-Datei sehr klein ({file_size} bytes), möglicherweise korrupt: {current_filename}")
-                else:
-                    logger.debug(f"Segment beendet: {current_filename} ({file_size} bytes)")
+                current_size = os.path.getsize(current_segment) if current_segment else 0
+            except OSError:
+                current_size = 0
+            metrics['total_size'] = finished_bytes + current_size
+        if metrics['bitrate_kbps'] is None and metrics['out_time']:
+            metrics['bitrate_kbps'] = round(metrics['total_size'] * 8 / metrics['out_time'] / 1000, 1)
+        
+        # Hinter Echtzeit zurückfallen erkennen, bevor Material verloren geht
+        now = time.time()
+        speed = metrics['speed']
+        if speed is not None and speed < RECORD_SPEED_WARNING:
+            if slow_since is None:
+                slow_since = now
+        else:
+            slow_since = None
+        falling_behind = slow_since is not None and now - slow_since >= RECORD_SPEED_WARNING_DURATION
+        if falling_behind and not status.get('metrics', {}).get('falling_behind'):
+            logger.warning(f"Aufnahme Kamera {camera_index} fällt hinter Echtzeit zurück (Geschwindigkeit {speed:.2f}x)")
+        
+        metrics.update({
+            'falling_behind': falling_behind,
+            'restarts': restarts,
+            'ended': progress.get('progress') == 'end',
+            'updated': datetime.now().isoformat()
+        })
+        status['metrics'] = metrics
+    
+    async def start_ffmpeg():
+        """Startet den FFmpeg-Prozess mit Segment-Muxer"""
+        nonlocal current_process, reader_tasks, finished_bytes, slow_since, last_progress, expected_boundary, filename_pending
         
-        # Erstelle neue Datei
-        current_filename = get_recording_filename(host, port)
-        # Füge Segment-Index hinzu falls Datei bereits existiert
-        if os.path.exists(current_filename):
-            base, ext = os.path.splitext(current_filename)
-            current_filename = f"{base}_{segment_index}{ext}"
-            segment_index += 1
+        # Sekunden bis zur nächsten Segment-Grenze (Stream-Zeit beginnt beim Start bei 0)
+        now = datetime.now()
+        expected_boundary = get_segment_start(now, segment_duration) + timedelta(seconds=segment_duration)
+        next_boundary = (expected_boundary - now).total_seconds()
         
         # FFmpeg-Befehl für RTSP-Aufnahme mit Audio
         # -rtsp_transport tcp: Stabilere Verbindung
         # -i: Input RTSP-Stream
-        # -vf scale: Video-Skalierung (falls halbierte Auflösung)
-        # -c:v libx264: H.264 Video-Codec
-        # -preset medium: Encoding-Geschwindigkeit
-        # -crf 23: Qualität (entspricht etwa VIDEO_QUALITY 65)
-        # -c:a aac: AAC Audio-Codec
-        # -b:a 128k: Audio-Bitrate
-        # -f mp4: MP4 Format
-        # -movflags +faststart: Schnelleres Abspielen
-        # -y: Überschreibe Datei falls vorhanden
+        # -map: erster Video- und (falls vorhanden) erster Audio-Stream
+        # -c:v copy: Video unverändert übernehmen (Kopier-Modus)
+        # -vf scale / -c:v libx264 -preset medium -crf 23: Neukodierung (halbierte Auflösung oder 'transcode')
+        # -c:a copy bzw. aac -b:a 128k: AAC wird kopiert, andere Audio-Codecs kodiert
+        # -f segment: Segment-Muxer, neue Datei an jeder Uhrzeit-Grenze (segment_atclocktime) am nächsten Keyframe
+        # -segment_list pipe:1: FFmpeg meldet jedes abgeschlossene Segment auf stdout
         
         ffmpeg_args = [
             ffmpeg_cmd,
+            '-loglevel', 'warning',
+            '-nostats',
+            '-progress', 'pipe:2',  # Fortschritt als Schlüssel=Wert-Blöcke auf stderr
             '-rtsp_transport', 'tcp',  # Stabilere RTSP-Verbindung
             '-i', stream_url,
+            '-map', '0:v:0',
+            '-map', '0:a:0?',
         ]
         
-        # Füge Video-Skalierung hinzu falls halbierte Auflösung
-        original_width = status.get('original_width', recording_width * 2)
-        original_height = status.get('original_height', recording_height * 2)
-        if recording_width < original_width or recording_height < original_height:
-            # Füge Scale-Filter hinzu
-            scale_filter = f'scale={recording_width}:{recording_height}'
-            ffmpeg_args.extend(['-vf', scale_filter])
+        if copy_video:
+            ffmpeg_args.extend(['-c:v', 'copy'])
+            if codecs['video'] == 'hevc':
+                ffmpeg_args.extend(['-tag:v', 'hvc1'])  # HEVC in MP4 abspielbar für Browser/QuickTime
+        else:
+            # Füge Video-Skalierung hinzu falls halbierte Auflösung
+            if scaling:
+                scale_filter = f'scale={recording_width}:{recording_height}'
+                ffmpeg_args.extend(['-vf', scale_filter])
+            ffmpeg_args.extend([
+                '-c:v', 'libx264',
+                '-preset', 'medium',
+                '-crf', '23',  # Qualität (entspricht etwa VIDEO_QUALITY 65)
+                # Keyframes auf die Uhrzeit-Grenzen legen, damit exakt geschnitten werden kann
+                '-force_key_frames', f'expr:gte(t,{next_boundary:.3f}+n_forced*{segment_duration})',
+            ])
+        
+        if copy_audio:
+            ffmpeg_args.extend(['-c:a', 'copy'])
+        else:
+            ffmpeg_args.extend(['-c:a', 'aac', '-b:a', '128k'])
         
-        # Video- und Audio-Codec-Einstellungen
         # Verwende fragmentierte MP4s (+empty_moov+default_base_moof) damit Dateien
         # während der Aufnahme abspielbar sind und nicht korrupt werden
+        # Dateiname mit Startzeit des Segments (strftime), jedes Segment beginnt bei Zeitstempel 0
         ffmpeg_args.extend([
-            '-c:v', 'libx264',
-            '-preset', 'medium',
-            '-crf', '23',  # Qualität (entspricht etwa VIDEO_QUALITY 65)
-            '-c:a', 'aac',
-            '-b:a', '128k',
-            '-f', 'mp4',
-            '-movflags', '+empty_moov+default_base_moof',  # Fragmentierte MP4s - abspielbar während Aufnahme
-            '-frag_duration', '1',  # Fragment alle 1 Sekunde für bessere Abspielbarkeit
-            '-y',  # Überschreibe Datei
-            current_filename
+            '-f', 'segment',
+            '-segment_time', str(segment_duration),
+            '-segment_atclocktime', '1',
+            '-segment_format', 'mp4',
+            '-segment_format_options', 'movflags=+empty_moov+default_base_moof:frag_duration=1',
+            '-reset_timestamps', '1',
+            '-segment_list', 'pipe:1',
+            '-segment_list_type', 'csv',
+            '-strftime', '1',
+            '-strftime_mkdir', '1',
+            os.path.join(staging_dir, f"{host}_{port}_%Y-%m-%d_%H-%M-%S.mp4")
         ])
         
         try:
-            # Starte FFmpeg-Prozess
-            current_process = subprocess.Popen(
-                ffmpeg_args,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                bufsize=0
+            os.makedirs(staging_dir, exist_ok=True)
+            # Starte FFmpeg-Prozess als Kind des Supervisor-Loops
+            current_process = await asyncio.create_subprocess_exec(
+                *ffmpeg_args,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
             )
-            
-            segment_start_time = datetime.now()
-            status['ffmpeg_process'] = current_process
-            status['filename'] = current_filename
-            logger.info(f"FFmpeg-Segment gestartet: {current_filename}")
-            return True
         except Exception as e:
             logger.error(f"Fehler beim Starten von FFmpeg: {e}")
+            current_process = None
             return False
+        
+        # stdout: Segment-Liste (Abschluss-Callback), stderr: Fortschritt und Warnungen - beide müssen
+        # gelesen werden, sonst läuft die Pipe voll und FFmpeg blockiert
+        finished_bytes = 0
+        slow_since = None
+        last_progress = time.time()
+        reader_tasks = [
+            asyncio.create_task(read_segment_list(current_process.stdout, on_segment_complete)),
+            asyncio.create_task(read_ffmpeg_progress(current_process.stderr, f"Kamera {camera_index}", on_progress))
+        ]
+        
+        status['ffmpeg_process'] = current_process
+        filename_pending = True
+        logger.info(f"FFmpeg-Aufnahme gestartet für Kamera {camera_index} (Segmente à {segment_duration}s)")
+        return True
     
-    # Erstelle erstes Segment
-    if not create_new_segment():
-        logger.error("Konnte erstes FFmpeg-Segment nicht erstellen")
-        return
+    async def stop_ffmpeg(graceful=True):
+        """Beendet FFmpeg sauber ('q'), damit das letzte Segment abgeschlossen wird
+        graceful=False: hängender Prozess, sofort terminate/kill"""
+        nonlocal current_process
+        if current_process is None:
+            return
+        process = current_process
+        current_process = None
+        if graceful and time.time() - last_progress > RECORDER_HUNG_TIMEOUT:
+            # Hängender Prozess reagiert nicht auf 'q' - nicht erst auf das Timeout warten
+            logger.warning(f"FFmpeg meldet seit {time.time() - last_progress:.0f}s keinen Fortschritt, verwende terminate")
+            graceful = False
+        if process.returncode is None and not graceful:
+            await terminate_ffmpeg(process)
+        elif process.returncode is None:
+            try:
+                # Sende 'q' Signal um FFmpeg sauber zu beenden
+                process.stdin.write(b'q\n')
+                await process.stdin.drain()
+                await asyncio.wait_for(process.wait(), RECORDER_STOP_TIMEOUT)
+            except asyncio.TimeoutError:
+                # Falls FFmpeg nicht sauber beendet, versuche terminate
+                logger.warning(f"FFmpeg beendete sich nicht sauber, verwende terminate")
+                await terminate_ffmpeg(process)
+            except (OSError, ConnectionError):
+                await terminate_ffmpeg(process)
+        # Letzte Meldungen der Segment-Liste abwarten, dann verbliebene Dateien übernehmen
+        # (FFmpeg abgestürzt oder beendet, bevor es das Segment gemeldet hat)
+        if reader_tasks:
+            await asyncio.wait(reader_tasks, timeout=5)
+        final_paths = finalize_staged_segments(host, port)
+        if final_paths:
+            status['last_segment'] = final_paths[-1]
+            status['filename'] = final_paths[-1]
     
-    # Überwache Aufnahme und segmentiere alle 10 Minuten
-    while status['recording']:
+    async def restart_ffmpeg(graceful=True):
+        """Startet FFmpeg nach kurzer Pause neu; False wenn die Aufnahme inzwischen gestoppt wurde"""
+        nonlocal restarts
+        await stop_ffmpeg(graceful)
         try:
-            # Prüfe ob Prozess noch läuft
-            if current_process.poll() is not None:
-                # Prozess beendet (Fehler oder Stream-Ende)
-                logger.warning(f"FFmpeg-Prozess beendet (Returncode: {current_process.returncode})")
-                # Versuche neu zu verbinden
-                time.sleep(2)
-                if not create_new_segment():
-                    logger.error("Konnte FFmpeg-Segment nach Fehler nicht neu erstellen")
-                    break
+            await asyncio.wait_for(stop_event.wait(), RECORDER_RESTART_DELAY)
+            return False
+        except asyncio.TimeoutError:
+            pass
+        restarts += 1
+        if not await start_ffmpeg():
+            logger.error("Konnte FFmpeg nach Fehler nicht neu starten")
+            return False
+        return True
+    
+    if not await start_ffmpeg():
+        logger.error("Konnte FFmpeg-Aufnahme nicht starten")
+        return
+    
+    # Überwache Aufnahme: wartet gleichzeitig auf Prozess-Ende, Stopp und die nächste Segment-Grenze
+    stop_wait = asyncio.create_task(stop_event.wait())
+    try:
+        while status['recording']:
+            exit_wait = asyncio.create_task(current_process.wait())
+            rotation_check = expected_boundary + timedelta(seconds=SEGMENT_ROTATION_GRACE)
+            timeout = max(0, (rotation_check - datetime.now()).total_seconds())
+            if filename_pending:
+                timeout = min(timeout, 1)  # Bis das erste Segment angelegt ist, jede Sekunde nachsehen
+            done, _ = await asyncio.wait({exit_wait, stop_wait}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            
+            if stop_wait in done:
+                exit_wait.cancel()
+                break
             
-            # Prüfe ob Segment-Wechsel nötig ist
-            elapsed = (datetime.now() - segment_start_time).total_seconds()
-            if elapsed >= segment_duration:
-                logger.info(f"Segment-Wechsel nach {elapsed:.0f}s (10 Minuten)")
-                if not create_new_segment():
-                    logger.error("Konnte neues Segment nicht erstellen")
+            if exit_wait in done:
+                # Prozess beendet (Fehler oder Stream-Ende) - sofort neu verbinden
+                logger.warning(f"FFmpeg-Prozess beendet (Returncode: {exit_wait.result()})")
+                if not await restart_ffmpeg():
                     break
+                continue
             
-            time.sleep(1)  # Prüfe jede Sekunde
+            exit_wait.cancel()
             
-        except Exception as e:
-            logger.error(f"Fehler während FFmpeg-Aufnahme: {e}")
-            time.sleep(2)
+            if filename_pending:
+                current_segment = get_current_staged_segment(host, port)
+                if current_segment:
+                    status['filename'] = current_segment
+                    filename_pending = False
+                if datetime.now() < rotation_check:
+                    continue
+            
+            # Segment-Grenze überschritten: FFmpeg muss inzwischen ein neues Segment begonnen haben
+            current_segment = get_current_staged_segment(host, port)
+            segment_start = parse_recording_start(current_segment) if current_segment else None
+            if segment_start is None or get_segment_start(segment_start, segment_duration) < expected_boundary:
+                logger.warning(f"Kein neues Segment seit {expected_boundary.strftime('%H:%M:%S')} für Kamera {camera_index}, starte FFmpeg neu")
+                if not await restart_ffmpeg(graceful=False):
+                    break
+                continue
+            
+            status['filename'] = current_segment
+            expected_boundary += timedelta(seconds=segment_duration)
+    
+    except Exception as e:
+        logger.error(f"Fehler während FFmpeg-Aufnahme: {e}")
     
-    # Finales Cleanup
-    if current_process is not None:
+    finally:
+        # Finales Cleanup
+        stop_wait.cancel()
+        await stop_ffmpeg()
+        if status.get('last_segment'):
+            status['filename'] = status['last_segment']
+        logger.info(f"FFmpeg-Aufnahme beendet für Kamera {camera_index}")
+
+
+async def terminate_ffmpeg(process, timeout=RECORDER_KILL_TIMEOUT):
+    """Beendet einen FFmpeg-Prozess hart (terminate, notfalls kill)"""
+    try:
+        process.terminate()
+        await asyncio.wait_for(process.wait(), timeout)
+    except ProcessLookupError:
+        pass
+    except asyncio.TimeoutError:
         try:
-            current_process.stdin.write(b'q\n')
-            current_process.stdin.flush()
-            current_process.wait(timeout=10)  # Mehr Zeit für sauberes Beenden
-        except subprocess.TimeoutExpired:
-            logger.warning(f"FFmpeg beendete sich nicht sauber beim Finalen Cleanup")
-            try:
-                current_process.terminate()
-                current_process.wait(timeout=5)
-            except:
-                try:
-                    current_process.kill()
-                except:
-                    pass
-        except:
-            try:
-                current_process.terminate()
-                current_process.wait(timeout=2)
-            except:
-                try:
-                    current_process.kill()
-                except:
-                    pass
-        
-        # Prüfe letzte Datei
-        if current_filename and os.path.exists(current_filename):
-            file_size = os.path.getsize(current_filename)
-            if file_size < 1024:
-                logger.warning(f"Letzte Segment-Datei sehr klein ({file_size} bytes), möglicherweise korrupt: {current_filename}")
-            else:
-                logger.info(f"Letztes Segment geschlossen: {current_filename} ({file_size} bytes)")
-    
-    logger.info(f"FFmpeg-Aufnahme beendet für Kamera {camera_index}")
+            process.kill()
+        except ProcessLookupError:
+            pass
+        await process.wait()
+
+
+def get_recorder_loop():
+    """Event-Loop des Aufnahme-Supervisors (wird beim ersten Aufruf in einem eigenen Thread gestartet)"""
+    global recorder_loop
+    with recorder_loop_lock:
+        if recorder_loop is None or recorder_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='recorder-supervisor', daemon=True).start()
+            recorder_loop = loop
+        return recorder_loop
+
+
+async def stop_ffmpeg_recordings(statuses):
+    """Stoppt mehrere FFmpeg-Aufnahmen gleichzeitig (läuft im Supervisor-Loop)"""
+    tasks = []
+    for status in statuses:
+        status['recording'] = False
+        if status.get('stop_event') is not None:
+            status['stop_event'].set()
+        if status.get('task') is not None:
+            tasks.append(status['task'])
+    if tasks:
+        # Jeder Task beendet seinen Prozess selbst ('q', terminate, kill) - Sicherheitsnetz darüber
+        _, pending = await asyncio.wait(tasks, timeout=RECORDER_STOP_TIMEOUT + RECORDER_KILL_TIMEOUT + 10)
+        for task in pending:
+            task.cancel()
 
 
 def record_camera_opencv(camera_index):
@@ -1902,16 +3482,16 @@ def record_camera_opencv(camera_index):
     recording_width = status.get('recording_width', width)
     recording_height = status.get('recording_height', height)
     
-    # Segmentierung: Neue Datei alle 10 Minuten
-    segment_duration = 600  # 10 Minuten in Sekunden
+    # Segmentierung: Neue Datei an jeder Uhrzeit-Grenze (z.B. :00, :10, :20 bei 10 Minuten)
+    segment_duration = get_segment_duration()
     frame_count = 0
-    segment_start_time = datetime.now()
+    segment_end_time = datetime.now()
     current_writer = None
     current_filename = None
     
     def create_new_segment():
         """Erstellt ein neues Video-Segment"""
-        nonlocal current_writer, current_filename, segment_start_time, frame_count
+        nonlocal current_writer, current_filename, segment_end_time, frame_count
         
         # Schließe alte Datei sauber
         if current_writer is not None:
@@ -1921,8 +3501,10 @@ def record_camera_opencv(camera_index):
             except:
                 pass
         
-        # Erstelle neue Datei
-        current_filename = get_recording_filename(host, port)
+        # Erstelle neue Datei (Name nach tatsächlichem Beginn, Ende an der nächsten Segment-Grenze)
+        now = datetime.now()
+        segment_start = get_segment_start(now, segment_duration)
+        current_filename = get_segment_filename(host, port, now)
         # MP4-Format mit H.264 Codec für bessere Komprimierung
         # Versuche verschiedene H.264 Codecs (abhängig von System)
         fourcc = None
@@ -1966,7 +3548,7 @@ def record_camera_opencv(camera_index):
             logger.error(f"Konnte VideoWriter nicht erstellen: {current_filename}")
             return False
         
-        segment_start_time = datetime.now()
+        segment_end_time = segment_start + timedelta(seconds=segment_duration)
         frame_count = 0
         status['writer'] = current_writer
         status['filename'] = current_filename
@@ -1999,11 +3581,9 @@ def record_camera_opencv(camera_index):
                         except:
                             pass
                     
-                    # Prüfe ob neues Segment nötig ist (nur Zeit)
-                    elapsed = (datetime.now() - segment_start_time).total_seconds()
-                    
-                    if elapsed >= segment_duration:
-                        logger.info(f"Segment-Wechsel nach {elapsed:.0f}s (10 Minuten)")
+                    # Prüfe ob neues Segment nötig ist (Uhrzeit-Grenze erreicht)
+                    if datetime.now() >= segment_end_time:
+                        logger.info(f"Segment-Wechsel an Grenze {segment_end_time.strftime('%H:%M:%S')}")
                         if not create_new_segment():
                             logger.error("Konnte neues Segment nicht erstellen")
                             break
@@ -2038,70 +3618,66 @@ def record_camera_opencv(camera_index):
     logger.info(f"Aufnahme beendet für Kamera {camera_index}")
 
 
-def stop_recording(camera_index):
-    """Stoppt die Aufnahme für eine Kamera"""
-    if camera_index not in recording_status:
-        return False, "Keine aktive Aufnahme"
+def stop_recordings(camera_indices):
+    """Stoppt mehrere Aufnahmen gleichzeitig - FFmpeg-Aufnahmen parallel über den Supervisor,
+    OpenCV-Aufnahmen werden alle zusammen geschlossen. Gibt {camera_index: Dateiname} zurück"""
+    statuses = {}
+    for camera_index in camera_indices:
+        status = recording_status.get(camera_index)
+        if status and status['recording']:
+            statuses[camera_index] = status
+    if not statuses:
+        return {}
     
-    status = recording_status[camera_index]
-    if not status['recording']:
-        return False, "Keine aktive Aufnahme"
+    for status in statuses.values():
+        status['recording'] = False
     
-    status['recording'] = False
-    filename = status['filename']
-    
-    # Stoppe FFmpeg-Prozess falls aktiv
-    if 'ffmpeg_process' in status and status['ffmpeg_process'] is not None:
+    # Stoppe alle FFmpeg-Prozesse gleichzeitig (jeder schließt sein letztes Segment sauber ab)
+    ffmpeg_statuses = [status for status in statuses.values() if status.get('use_ffmpeg')]
+    if ffmpeg_statuses:
         try:
-            process = status['ffmpeg_process']
-            process.stdin.write(b'q\n')
-            process.stdin.flush()
-            process.wait(timeout=10)  # Mehr Zeit für sauberes Beenden
-        except subprocess.TimeoutExpired:
-            logger.warning(f"FFmpeg beendete sich nicht sauber beim Stoppen")
+            future = asyncio.run_coroutine_threadsafe(stop_ffmpeg_recordings(ffmpeg_statuses), get_recorder_loop())
+            future.result(timeout=RECORDER_STOP_TIMEOUT + RECORDER_KILL_TIMEOUT + 15)
+        except Exception as e:
+            logger.error(f"Fehler beim Stoppen der FFmpeg-Aufnahmen: {e}")
+    
+    # Stoppe OpenCV Writer falls aktiv
+    opencv_statuses = [status for status in statuses.values() if not status.get('use_ffmpeg')]
+    for status in opencv_statuses:
+        if 'writer' in status and status['writer'] is not None:
             try:
-                process.terminate()
-                process.wait(timeout=5)
+                status['writer'].release()
             except:
-                try:
-                    process.kill()
-                except:
-                    pass
-        except:
+                pass
+        
+        # Schließe Video-Capture
+        if 'cap' in status and status['cap'] is not None:
             try:
-                process.terminate()
-                process.wait(timeout=2)
+                status['cap'].release()
             except:
-                try:
-                    process.kill()
-                except:
-                    pass
-    
-    # Stoppe OpenCV Writer falls aktiv
-    if 'writer' in status and status['writer'] is not None:
-        try:
-            status['writer'].release()
-        except:
-            pass
-    
-    # Schließe Video-Capture
-    if 'cap' in status and status['cap'] is not None:
-        try:
-            status['cap'].release()
-        except:
-            pass
-    
-    # Warte kurz, damit Thread sauber beendet wird
-    time.sleep(0.5)
+                pass
     
-    # Entferne aus Status
-    if camera_index in recording_status:
-        del recording_status[camera_index]
-    if camera_index in recording_locks:
-        del recording_locks[camera_index]
+    # Warte kurz, damit die Threads sauber beendet werden (einmal für alle)
+    if opencv_statuses:
+        time.sleep(0.5)
     
-    logger.info(f"Aufnahme gestoppt: {filename}")
-    return True, filename
+    filenames = {}
+    for camera_index, status in statuses.items():
+        filenames[camera_index] = status.get('last_segment') or status['filename']
+        # Entferne aus Status
+        if recording_status.get(camera_index) is status:
+            del recording_status[camera_index]
+            recording_locks.pop(camera_index, None)
+        logger.info(f"Aufnahme gestoppt: {filenames[camera_index] or 'keine Datei angelegt'}")
+    return filenames
+
+
+def stop_recording(camera_index):
+    """Stoppt die Aufnahme für eine Kamera"""
+    filenames = stop_recordings([camera_index])
+    if camera_index not in filenames:
+        return False, "Keine aktive Aufnahme"
+    return True, filenames[camera_index]
 
 
 @app.route('/record/start/<int:camera_index>', methods=['POST'])
@@ -2129,10 +3705,15 @@ def record_status():
                 'recording': rec['recording'],
                 'filename': rec['filename'],
                 'start_time': rec['start_time'].isoformat(),
-                'use_ffmpeg': rec.get('use_ffmpeg', False)  # Zeigt ob FFmpeg oder OpenCV verwendet wird
+                'use_ffmpeg': rec.get('use_ffmpeg', False),  # Zeigt ob FFmpeg oder OpenCV verwendet wird
+                'record_mode': rec.get('record_mode'),  # 'copy' = ohne Neukodierung
+                # FFmpeg-Metriken: fps, speed (1.0 = Echtzeit), bitrate_kbps, drop_frames, dup_frames,
+                # total_size, falling_behind (länger langsamer als Echtzeit)
+                'metrics': rec.get('metrics')
             }
         else:
             status[idx] = {'recording': False}
+        status[idx]['online'] = camera.get('online')
     return status
 
 
@@ -2168,13 +3749,12 @@ def set_credentials():
         # Aktualisiere Auflösungseinstellung
         new_half_resolution = data.get('half_resolution', False)
         
-        # Stoppe alle laufenden Aufnahmen
+        # Stoppe alle laufenden Aufnahmen (gleichzeitig)
         logger.info("Stoppe alle laufenden Aufnahmen vor Credential-Änderung...")
-        for camera_index in list(recording_status.keys()):
-            try:
-                stop_recording(camera_index)
-            except:
-                pass
+        try:
+            stop_recordings(list(recording_status.keys()))
+        except:
+            pass
         
         # Aktualisiere Credentials und Einstellungen
         with credentials_lock:
@@ -2221,8 +3801,9 @@ def get_recordings():
         # Struktur: {date: {time_range: [recordings]}}
         recordings_by_time = {}
         
-        # Durchlaufe alle Dateien rekursiv
+        # Durchlaufe alle Dateien rekursiv (laufende Segmente im Staging-Ordner werden nicht angezeigt)
         for root, dirs, files in os.walk(aufnahmen_dir):
+            dirs[:] = [d for d in dirs if d != RECORDING_STAGING_DIR]
             for file in files:
                 if file.endswith('.mp4'):
                     file_path = os.path.join(root, file)
@@ -2288,6 +3869,67 @@ def get_recordings():
         return {'success': False, 'message': str(e)}, 500
 
 
+@app.route('/api/recordings/lookup')
+def lookup_recording():
+    """Findet die Aufnahme einer Kamera zu einem Zeitpunkt - Pfad wird berechnet, nicht gesucht
+    Parameter: camera=IP:PORT oder Kamera-Index, time=YYYY-MM-DDTHH:MM:SS (Standard: jetzt)"""
+    from flask import request
+    
+    camera_param = request.args.get('camera', '')
+    if camera_param.isdigit():
+        camera_index = int(camera_param)
+        if camera_index >= len(found_cameras):
+            return {'success': False, 'message': 'Kamera nicht gefunden'}, 404
+        host = found_cameras[camera_index].get('host')
+        port = found_cameras[camera_index].get('port')
+    elif ':' in camera_param:
+        host, port = camera_param.rsplit(':', 1)
+    else:
+        return {'success': False, 'message': 'Parameter camera fehlt (IP:PORT oder Index)'}, 400
+    
+    try:
+        timestamp = datetime.fromisoformat(request.args['time']) if request.args.get('time') else datetime.now()
+    except ValueError:
+        return {'success': False, 'message': 'Ungültige Zeit (Format: YYYY-MM-DDTHH:MM:SS)'}, 400
+    
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)  # Aufnahmen sind nach lokaler Zeit benannt
+    segment_start, files = find_segment_files(host, port, timestamp)
+    # Laufendes Segment liegt noch im Staging-Ordner (auch nach Neustart im selben Segment)
+    current_segment = get_current_staged_segment(host, port)
+    if current_segment:
+        staged_start = parse_recording_start(current_segment)
+        if staged_start and get_segment_start(staged_start) == segment_start:
+            files.append(current_segment)
+    
+    # Gewählt wird die Datei mit dem spätesten Beginn <= timestamp (Beginn steht im Dateinamen);
+    # sie muss bis timestamp reichen (Ende = letzte Änderung, beim laufenden Segment jetzt)
+    chosen = None
+    for candidate in files:
+        candidate_start = parse_recording_start(candidate)
+        if candidate_start is not None and candidate_start <= timestamp:
+            chosen = candidate
+    if chosen is not None and chosen != current_segment:
+        if datetime.fromtimestamp(os.path.getmtime(chosen)) < timestamp:
+            chosen = None
+    
+    filenames = [os.path.relpath(f, 'aufnahmen').replace('\\', '/') for f in files]
+    if chosen is None:
+        return {'success': False, 'message': 'Keine Aufnahme für diesen Zeitpunkt',
+                'segment_start': segment_start.isoformat(), 'filenames': filenames}, 404
+    recording = chosen == current_segment
+    
+    return {
+        'success': True,
+        'camera': f"{host}:{port}",
+        'segment_start': segment_start.isoformat(),
+        'segment_end': (segment_start + timedelta(seconds=get_segment_duration())).isoformat(),
+        'filename': filenames[files.index(chosen)],
+        'filenames': filenames,
+        'recording': recording
+    }
+
+
 @app.route('/api/recordings/play/<path:filename>')
 def play_recording(filename):
     """Streamt eine Aufnahme-Datei für Video-Player"""
@@ -2332,124 +3974,1079 @@ def download_recording(filename):
         return {'error': str(e)}, 500
 
 
-def get_camera_stream(camera_index):
-    """Generator für Video-Stream von einer Kamera (verwendet Sub-Stream für Live-Vorschau)"""
+def get_live_stream_url(camera_index):
+    """Stream-URL für die Live-Vorschau (Sub-Stream, Fallback auf Haupt-Stream)"""
     if camera_index >= len(found_cameras):
-        return
-    
+        return None
     camera = found_cameras[camera_index]
-    # Verwende live_stream_url (Sub-Stream) für Live-Vorschau, Fallback auf stream_url
-    stream_url = camera.get('live_stream_url') or camera.get('stream_url')
-    
-    if not stream_url:
-        return
-    
-    # Erstelle oder hole Video-Capture
-    if camera_index not in video_captures:
-        try:
-            cap = cv2.VideoCapture(stream_url)
-            if not cap.isOpened():
-                logger.error(f"Konnte Stream nicht öffnen: {stream_url}")
-                return
-            video_captures[camera_index] = cap
-            capture_locks[camera_index] = threading.Lock()
-        except Exception as e:
-            logger.error(f"Fehler beim Öffnen des Streams: {e}")
-            return
+    return camera.get('live_stream_url') or camera.get('stream_url')
+
+
+def _grabber_variants(grabber):
+    """JPEG-Varianten (Breite, Qualität), die die Zuschauer gerade abrufen (Mosaik-Kacheln nutzen das Rohbild)"""
+    with grabber['condition']:
+        variants = [client['variant'] for client in grabber['clients'].values()]
+    keys = {(variant['w'], variant['q']) for variant in variants if variant and variant.get('q') is not None}
+    return tuple(sorted(keys, key=lambda key: (key[0] or 0, key[1])))
+
+
+def _grabber_target_fps(grabber):
+    """Höchste von den Zuschauern gewünschte Bildrate (None = volle Bildrate der Kamera, 0 = keine Zuschauer)"""
+    with grabber['condition']:
+        clients = list(grabber['clients'].values())
+    if not clients:
+        return 0
+    rates = [(client['variant'] or {}).get('fps') for client in clients]
+    if any(rate is None for rate in rates):
+        return None
+    return max(rates)
+
+
+def run_live_capture(label, get_stream_url, keep_running, get_target_fps, publish, counters):
+    """Capture-Schleife einer Kamera - läuft im Grabber-Thread oder in einem Worker-Prozess
     
-    cap = video_captures[camera_index]
-    lock = capture_locks[camera_index]
+    Die Taktung folgt dem Zeitstempel der Quelle (CAP_PROP_POS_MSEC) statt festen Pausen:
+    es wird immer sofort das nächste Paket geholt (grab), damit sich im Puffer keine Verzögerung
+    aufbaut, aber nur die Bilder, die ein Zuschauer bei seiner Bildrate braucht, werden
+    in BGR umgewandelt (retrieve) und an publish(frame) übergeben"""
+    cap = None
+    pacing_anchor = None  # (wall_time, source_seconds) für Quellen, die schneller als Echtzeit liefern
+    last_retrieved = None  # Quell-Zeitstempel des zuletzt veröffentlichten Bildes
     
-    while True:
-        with lock:
-            ret, frame = cap.read()
-            if not ret:
-                # Versuche Stream neu zu verbinden
-                cap.release()
+    while keep_running():
+        if cap is None:
+            # URL bei jedem Verbindungsaufbau neu lesen (kann sich nach einem Scan geändert haben)
+            stream_url = get_stream_url()
+            if stream_url:
                 try:
                     cap = cv2.VideoCapture(stream_url)
-                    if cap.isOpened():
-                        video_captures[camera_index] = cap
-                        ret, frame = cap.read()
+                    if not cap.isOpened():
+                        logger.error(f"Konnte Stream nicht öffnen: {stream_url}")
+                        cap.release()
+                        cap = None
                     else:
-                        break
-                except:
-                    break
+                        # Möglichst kein internes Puffern (wird nicht von allen Backends unterstützt)
+                        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                except Exception as e:
+                    logger.error(f"Fehler beim Öffnen des Streams: {e}")
+                    cap = None
+            if cap is None:
+                time.sleep(LIVE_RECONNECT_DELAY)
+                continue
+            pacing_anchor = None
+            last_retrieved = None
+        
+        if not cap.grab():
+            logger.warning(f"Live-Stream von {label} unterbrochen, verbinde neu...")
+            cap.release()
+            cap = None
+            time.sleep(LIVE_RECONNECT_DELAY)
+            continue
+        counters['grabbed'] += 1
+        
+        # Quell-Takt: liefert die Quelle schneller als Echtzeit (z.B. Datei, aufgestauter Puffer), wird gebremst
+        now = time.time()
+        source_time = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        if source_time > 0:
+            if pacing_anchor is None:
+                pacing_anchor = (now, source_time)
+            ahead = (source_time - pacing_anchor[1]) - (now - pacing_anchor[0])
+            if ahead < -LIVE_PACING_RESYNC or ahead > LIVE_PACING_RESYNC:
+                pacing_anchor = (now, source_time)
+                last_retrieved = None
+            elif ahead > 0:
+                # Bis zur Fälligkeit jedes Bildes warten - eine Toleranz würde Bilder paarweise
+                # freigeben und das Ein-Platz-Postfach verwirft dann jedes zweite
+                time.sleep(ahead)
+        
+        # Nur Bilder umwandeln, die bei der gewünschten Bildrate auch gesendet werden
+        target_fps = get_target_fps()
+        if target_fps == 0:
+            target_fps = LIVE_IDLE_FPS  # Ohne Zuschauer: nur selten umwandeln (für /snapshot)
+        if target_fps and source_time > 0 and last_retrieved is not None:
+            if source_time - last_retrieved < (1.0 / target_fps) - 0.005:
+                continue
+        
+        ret, frame = cap.retrieve()
+        if not ret:
+            continue
+        counters['retrieved'] += 1
+        last_retrieved = source_time
+        publish(frame)
+    
+    if cap is not None:
+        cap.release()
+
+
+def _live_grabber_keep_running(camera_index, grabber):
+    """False sobald der Grabber beendet werden soll
+    Ohne Zuschauer bleibt er noch live_grace_period Sekunden offen (z.B. für einen Seiten-Reload)"""
+    with live_grabbers_lock:
+        if not grabber['running']:
+            return False
+        if grabber['clients']:
+            grabber['idle_since'] = None
+        elif grabber['idle_since'] is None:
+            grabber['idle_since'] = time.time()
+        elif time.time() - grabber['idle_since'] >= live_grace_period:
+            grabber['running'] = False
+            if live_grabbers.get(camera_index) is grabber:
+                del live_grabbers[camera_index]
+            return False
+    return True
+
+
+def publish_live_frame(grabber, frame, jpegs=None):
+    """Veröffentlicht ein neues Bild an alle Zuschauer
+    jpegs: bereits (im Worker-Prozess) kodierte Varianten {(breite, qualität): jpeg}, werden in den Varianten-Cache übernommen"""
+    condition = grabber['condition']
+    with condition:
+        grabber['frame'] = frame
+        grabber['frame_time'] = time.time()
+        grabber['seq'] += 1
+        seq = grabber['seq']
+        # Neuestes Bild in jedes Postfach legen, ein noch nicht abgeholtes Bild gilt als verworfen
+        for client in grabber['clients'].values():
+            if client['slot'] is not None:
+                client['dropped'] += 1
+            client['slot'] = (seq, frame)
+            client['event'].set()
+        condition.notify_all()
+    
+    if jpegs:
+        with grabber['encode_lock']:
+            cache = grabber['jpeg_cache']
+            if seq > cache['seq']:
+                cache['seq'] = seq
+                cache['resized'] = {}
+                cache['variants'] = {}
+            if seq == cache['seq']:
+                cache['variants'].update(jpegs)
+
+
+def live_grabber_worker(camera_index, grabber):
+    """Liest fortlaufend Bilder von der Kamera und veröffentlicht das jeweils letzte
+    Die Zuschauer greifen nie selbst auf das VideoCapture zu"""
+    if live_worker_mode == 'processes':
+        live_grabber_relay(camera_index, grabber)
+    else:
+        def get_stream_url():
+            grabber['stream_url'] = get_live_stream_url(camera_index)
+            return grabber['stream_url']
+        
+        run_live_capture(f"Kamera {camera_index}", get_stream_url,
+                         lambda: _live_grabber_keep_running(camera_index, grabber),
+                         lambda: _grabber_target_fps(grabber),
+                         lambda frame: publish_live_frame(grabber, frame),
+                         grabber)
+    
+    with grabber['condition']:
+        for client in grabber['clients'].values():
+            client['event'].set()
+        grabber['condition'].notify_all()
+    logger.info(f"Live-Grabber für Kamera {camera_index} beendet")
+
+
+def attach_shared_memory(name):
+    """Öffnet den Shared-Memory-Block eines Worker-Prozesses nur zum Lesen, ohne ihn beim
+    resource_tracker anzumelden - freigegeben (unlink) wird er ausschließlich vom Worker"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    if os.name == 'posix':
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+def unlink_shared_memory(shm):
+    """Gibt einen Shared-Memory-Block des Workers frei. Der resource_tracker wird mit dem Hauptprozess
+    geteilt - dessen Abmeldung in attach_shared_memory wird vorher ausgeglichen"""
+    if sys.version_info < (3, 13) and os.name == 'posix':
+        resource_tracker.register(shm._name, 'shared_memory')
+    shm.unlink()
+
+
+def live_decode_stream(camera_index, token, state, results):
+    """Thread im Worker-Prozess: dekodiert eine Kamera, skaliert und kodiert die von den Zuschauern
+    abgerufenen JPEG-Varianten (state['variants']) und legt alles in einen Shared-Memory-Ringpuffer;
+    über die Queue gehen nur die Positionen. Jeder Platz hat einen Generationszähler (Seqlock),
+    damit der Hauptprozess überschriebene oder halb geschriebene Bilder erkennt"""
+    shm = None
+    slot_size = 0
+    slot = 0
+    generation = 0
+    counters = {'grabbed': 0, 'retrieved': 0}
+    
+    def publish(frame):
+        nonlocal shm, slot_size, slot, generation
+        frame_size = frame.nbytes
+        # Pro Platz: Rohbild + gleich viel Platz für die JPEG-Varianten (in der Praxis deutlich kleiner)
+        if shm is None or slot_size != frame_size * 2:
+            if shm is not None:
+                shm.close()
+                unlink_shared_memory(shm)
+            slot_size = frame_size * 2
+            shm = shared_memory.SharedMemory(create=True, size=LIVE_SHM_HEADER * LIVE_SHM_SLOTS + slot_size * LIVE_SHM_SLOTS)
+            slot = 0
+        
+        # Ungerade Generation: Platz wird beschrieben, gerade: vollständig
+        generation += 1
+        struct.pack_into('Q', shm.buf, slot * LIVE_SHM_HEADER, 2 * generation - 1)
+        offset = LIVE_SHM_HEADER * LIVE_SHM_SLOTS + slot * slot_size
+        np.ndarray(frame.shape, dtype=np.uint8, buffer=shm.buf, offset=offset)[:] = frame
+        
+        # Varianten wie get_live_jpeg: keine Vergrößerung, jede Breite wird nur einmal skaliert
+        jpegs = []
+        position = offset + frame_size
+        slot_end = offset + slot_size
+        resized = {}
+        keys = dict.fromkeys((width if width and frame.shape[1] > width else None, quality)
+                             for width, quality in state['variants'])
+        for width, quality in keys:
+            if width not in resized:
+                resized[width] = resize_to_width(frame, width)
+            ret, buffer = cv2.imencode('.jpg', resized[width], [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not ret or position + len(buffer) > slot_end:
+                continue
+            shm.buf[position:position + len(buffer)] = buffer.tobytes()
+            jpegs.append(((width, quality), position, len(buffer)))
+            position += len(buffer)
+        
+        struct.pack_into('Q', shm.buf, slot * LIVE_SHM_HEADER, 2 * generation)
+        results.put(('frame', camera_index, token, shm.name, frame.shape, slot, offset, 2 * generation, tuple(jpegs),
+                     counters['grabbed'], counters['retrieved']))
+        slot = (slot + 1) % LIVE_SHM_SLOTS
+    
+    try:
+        run_live_capture(f"Kamera {camera_index}", lambda: state['url'], lambda: state['running'],
+                         lambda: state['fps'], publish, counters)
+    finally:
+        if shm is not None:
+            shm.close()
+            unlink_shared_memory(shm)
+
+
+def live_decode_process(commands, results, opencv_threads):
+    """Worker-Prozess des Live-Pools: verwaltet die ihm zugeteilten Kameras (ein Thread pro Kamera)
+    Befehle: ('open', idx, token, url), ('fps', idx, token, fps), ('variants', idx, token, varianten),
+    ('close', idx, token), ('stop',)"""
+    cv2.setNumThreads(opencv_threads)
+    streams = {}  # {camera_index: {'thread', 'token', 'url', 'fps', 'variants', 'running'}}
+    
+    def stop_stream(camera_index):
+        state = streams.pop(camera_index, None)
+        if state is not None:
+            state['running'] = False
+            state['thread'].join(timeout=5)
+    
+    while True:
+        command = commands.get()
+        kind = command[0]
+        if kind == 'stop':
+            break
+        camera_index, token = command[1], command[2]
+        if kind == 'open':
+            stop_stream(camera_index)
+            state = {'thread': None, 'token': token, 'url': command[3], 'fps': 0, 'variants': (), 'running': True}
+            state['thread'] = threading.Thread(target=live_decode_stream,
+                                               args=(camera_index, token, state, results), daemon=True)
+            streams[camera_index] = state
+            state['thread'].start()
+        elif kind == 'fps' and camera_index in streams and streams[camera_index]['token'] == token:
+            streams[camera_index]['fps'] = command[3]
+        elif kind == 'variants' and camera_index in streams and streams[camera_index]['token'] == token:
+            streams[camera_index]['variants'] = command[3]
+        elif kind == 'close' and camera_index in streams and streams[camera_index]['token'] == token:
+            stop_stream(camera_index)
+    
+    for camera_index in list(streams):
+        stop_stream(camera_index)
+
+
+def live_pool_dispatcher(results):
+    """Verteilt die Bild-Meldungen der Worker-Prozesse an die Grabber (nur das neueste Bild zählt)"""
+    while True:
+        message = results.get()
+        if message is None:
+            break
+        camera_index, token = message[1], message[2]
+        with live_grabbers_lock:
+            grabber = live_grabbers.get(camera_index)
+        if grabber is None or grabber['token'] != token:
+            continue
+        inbox = grabber['inbox']
+        try:
+            inbox.put_nowait(message[3:])
+        except queue.Full:
+            try:
+                inbox.get_nowait()
+            except queue.Empty:
+                pass
+            inbox.put_nowait(message[3:])
+
+
+def get_live_pool():
+    """Startet den Worker-Pool für die Live-Vorschau beim ersten Bedarf"""
+    global live_pool
+    with live_pool_lock:
+        if live_pool is None:
+            count = live_workers or os.cpu_count() or 1
+            # spawn: kein fork eines Prozesses mit laufenden Threads (und gleiches Verhalten unter Windows)
+            context = multiprocessing.get_context('spawn')
+            results = context.Queue()
+            # shm_names: alle Shared-Memory-Blöcke, die der Hauptprozess gesehen hat (Aufräumen nach terminate)
+            pool = {'processes': [], 'commands': [], 'results': results, 'shm_names': set()}
+            for _ in range(count):
+                commands = context.Queue()
+                process = context.Process(target=live_decode_process, args=(commands, results, 1), daemon=True)
+                process.start()
+                pool['processes'].append(process)
+                pool['commands'].append(commands)
+            pool['dispatcher'] = threading.Thread(target=live_pool_dispatcher, args=(results,), daemon=True)
+            pool['dispatcher'].start()
+            live_pool = pool
+            logger.info(f"Live-Worker-Pool gestartet: {count} Prozesse")
+        return live_pool
+
+
+def stop_live_pool():
+    """Beendet alle Worker-Prozesse der Live-Vorschau"""
+    global live_pool
+    with live_pool_lock:
+        pool = live_pool
+        live_pool = None
+    if pool is None:
+        return
+    for commands in pool['commands']:
+        commands.put(('stop',))
+    for process in pool['processes']:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+            process.join(timeout=2)
+    # Blöcke eines hart beendeten Workers freigeben (normal hat der Worker sie bereits entfernt)
+    for shm_name in pool['shm_names']:
+        try:
+            shm = attach_shared_memory(shm_name)
+        except FileNotFoundError:
+            continue
+        shm.close()
+        unlink_shared_memory(shm)
+    pool['results'].put(None)
+    pool['dispatcher'].join(timeout=2)
+
+
+def live_grabber_relay(camera_index, grabber):
+    """Grabber im Prozess-Modus: die Kamera wird in einem Worker-Prozess dekodiert und die
+    abgerufenen Varianten dort kodiert - hier werden nur Bild und JPEGs aus dem Shared Memory
+    übernommen und veröffentlicht"""
+    pool = get_live_pool()
+    commands = pool['commands'][camera_index % len(pool['commands'])]
+    token = grabber['token']
+    sent_url = None
+    sent_fps = -1
+    sent_variants = None
+    shm = None
+    
+    try:
+        while _live_grabber_keep_running(camera_index, grabber):
+            stream_url = get_live_stream_url(camera_index)
+            if stream_url != sent_url:
+                grabber['stream_url'] = stream_url
+                commands.put(('open', camera_index, token, stream_url))
+                sent_url = stream_url
+                sent_fps = -1
+                sent_variants = None
+            target_fps = _grabber_target_fps(grabber)
+            if target_fps != sent_fps:
+                commands.put(('fps', camera_index, token, target_fps))
+                sent_fps = target_fps
+            variants = _grabber_variants(grabber)
+            if variants != sent_variants:
+                commands.put(('variants', camera_index, token, variants))
+                sent_variants = variants
             
-            if ret:
-                # Konvertiere Frame zu JPEG
-                ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-                if ret:
-                    frame_bytes = buffer.tobytes()
-                    yield (b'--frame\r\n'
-                           b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+            try:
+                shm_name, shape, slot, offset, generation, jpeg_index, grabbed, retrieved = grabber['inbox'].get(timeout=0.5)
+            except queue.Empty:
+                continue
+            
+            try:
+                if shm is None or shm.name != shm_name:
+                    if shm is not None:
+                        shm.close()
+                    shm = attach_shared_memory(shm_name)
+                    pool['shm_names'].add(shm_name)
+            except FileNotFoundError:
+                shm = None  # Puffer wurde nach Auflösungswechsel bereits ersetzt
+                continue
+            
+            # Seqlock: Generation vor und nach dem Kopieren prüfen - hat der Worker den Platz
+            # inzwischen neu beschrieben, wird das (zerrissene) Bild verworfen
+            header = slot * LIVE_SHM_HEADER
+            if struct.unpack_from('Q', shm.buf, header)[0] != generation:
+                continue
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=offset).copy()
+            jpegs = {key: bytes(shm.buf[start:start + length]) for key, start, length in jpeg_index}
+            if struct.unpack_from('Q', shm.buf, header)[0] != generation:
+                continue
+            grabber['grabbed'] = grabbed
+            grabber['retrieved'] = retrieved
+            publish_live_frame(grabber, frame, jpegs)
+    finally:
+        commands.put(('close', camera_index, token))
+        if shm is not None:
+            shm.close()
+
+
+def _get_or_start_grabber(camera_index):
+    """Gibt den laufenden Grabber einer Kamera zurück oder startet ihn (live_grabbers_lock muss gehalten werden)"""
+    grabber = live_grabbers.get(camera_index)
+    if grabber is None or not grabber['running']:
+        grabber = {
+            'thread': None,
+            'token': uuid.uuid4().hex,
+            'stream_url': None,
+            'frame': None,
+            'frame_time': None,
+            'seq': 0,
+            'condition': threading.Condition(),
+            'clients': {},
+            'idle_since': None,
+            'running': True,
+            'grabbed': 0,  # Von der Quelle geholte Bilder
+            'retrieved': 0,  # Davon umgewandelte und veröffentlichte Bilder
+            'inbox': queue.Queue(maxsize=1),  # Prozess-Modus: Position des neuesten Bildes im Shared Memory
+            'jpeg_cache': {'seq': 0, 'resized': {}, 'variants': {}},  # Skalierte/kodierte Varianten des aktuellen Frames
+            'encode_lock': threading.Lock()
+        }
+        grabber['thread'] = threading.Thread(target=live_grabber_worker, args=(camera_index, grabber), daemon=True)
+        live_grabbers[camera_index] = grabber
+        grabber['thread'].start()
+    return grabber
+
+
+def prewarm_live_grabbers():
+    """Öffnet die Live-Streams erreichbarer Kameras vorab, damit der RTSP-Verbindungsaufbau
+    schon läuft, während das Dashboard lädt (ohne Zuschauer schließt die Grace-Period sie wieder)
+    Pro Kamera höchstens einmal je LIVE_PREWARM_INTERVAL - sonst hält jedes Neuladen der Seite
+    (auch von HLS-Clients, die den Grabber nie abonnieren) alle RTSP-Verbindungen offen"""
+    now = time.time()
+    with cameras_lock:
+        cameras = list(enumerate(found_cameras))
+    for camera_index, camera in cameras:
+        if camera.get('online') is False or not get_live_stream_url(camera_index):
+            continue
+        if host_blocked(camera.get('host'), camera.get('port')):
+            continue
+        with live_grabbers_lock:
+            if camera_index in live_grabbers or now - live_prewarmed.get(camera_index, 0) < LIVE_PREWARM_INTERVAL:
+                continue
+            live_prewarmed[camera_index] = now
+            _get_or_start_grabber(camera_index)
+
+
+def subscribe_live_grabber(camera_index, remote_addr=None):
+    """Meldet einen Zuschauer an und startet bei Bedarf den Grabber-Thread der Kamera
+    Gibt (grabber, client) zurück, client ist das Postfach des Zuschauers"""
+    with live_grabbers_lock:
+        grabber = _get_or_start_grabber(camera_index)
+        grabber['idle_since'] = None
+        
+        client = {
+            'id': uuid.uuid4().hex[:8],
+            'remote': remote_addr,
+            'connected': datetime.now(),
+            'slot': None,  # (seq, frame) - wird vom Grabber überschrieben
+            'event': threading.Event(),
+            'variant': None,
+            'sent': 0,
+            'dropped': 0,
+            'skipped': 0  # Wegen ?fps= bewusst ausgelassene Bilder
+        }
+        with grabber['condition']:
+            grabber['clients'][client['id']] = client
+        return grabber, client
+
+
+def unsubscribe_live_grabber(grabber, client):
+    """Meldet einen Zuschauer ab (der Grabber beendet sich nach der Grace-Period ohne Zuschauer selbst)"""
+    with live_grabbers_lock:
+        with grabber['condition']:
+            grabber['clients'].pop(client['id'], None)
+    logger.info(f"Zuschauer {client['remote']} getrennt: {client['sent']} Bilder gesendet, {client['dropped']} verworfen")
+
+
+def parse_live_variant(args):
+    """Liest die Varianten-Parameter einer Live-Anfrage (?w=, ?fps=, ?q=) und begrenzt sie
+    Gibt (max_width, fps, quality) zurück, None = Originalbreite bzw. Bildrate der Kamera"""
+    width = args.get('w', type=int)
+    fps = args.get('fps', type=float)
+    quality = args.get('q', type=int)
+    
+    if width is not None:
+        width = max(LIVE_MIN_WIDTH, min(LIVE_MAX_WIDTH, width)) if width > 0 else None
+    if fps is not None:
+        fps = max(0.1, min(LIVE_MAX_FPS, fps)) if fps > 0 else None
+    if quality is None:
+        quality = LIVE_JPEG_QUALITY
+    quality = max(10, min(95, quality))
+    return width, fps, quality
+
+
+def resize_to_width(frame, max_width):
+    """Verkleinert ein Bild auf maximal max_width Pixel Breite (Seitenverhältnis bleibt erhalten)"""
+    height, width = frame.shape[:2]
+    if not max_width or width <= max_width:
+        return frame
+    new_height = max(1, round(height * max_width / width))
+    return cv2.resize(frame, (max_width, new_height), interpolation=cv2.INTER_AREA)
+
+
+def get_live_jpeg(grabber, frame, seq, max_width=None, quality=LIVE_JPEG_QUALITY):
+    """Liefert das JPEG eines Frames in der gewünschten Variante (Breite, Qualität)
+    Jede Variante wird pro Kamera und Frame nur einmal skaliert und kodiert und von allen
+    Zuschauern mit derselben Variante gemeinsam genutzt (Cache gilt nur für die letzte Sequenznummer)"""
+    if max_width and frame.shape[1] <= max_width:
+        max_width = None  # Keine Vergrößerung - gleiche Variante wie Originalbreite
+    key = (max_width, quality)
+    cache = grabber['jpeg_cache']
+    with grabber['encode_lock']:
+        if cache['seq'] == seq and key in cache['variants']:
+            return cache['variants'][key]
+        
+        resized = _cached_resize(cache, frame, seq, max_width)
+        
+        ret, buffer = cv2.imencode('.jpg', resized, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ret:
+            return None
+        jpeg = buffer.tobytes()
         
-        time.sleep(0.033)  # ~30 FPS
+        if seq == cache['seq']:
+            cache['variants'][key] = jpeg
+        return jpeg
+
+
+def _cached_resize(cache, frame, seq, max_width):
+    """Skaliert ein Bild über den Varianten-Cache des Grabbers (encode_lock muss gehalten werden)"""
+    if seq > cache['seq']:
+        cache['seq'] = seq
+        cache['resized'] = {}
+        cache['variants'] = {}
+    if seq == cache['seq'] and max_width in cache['resized']:
+        return cache['resized'][max_width]
+    
+    resized = resize_to_width(frame, max_width)
+    if seq == cache['seq']:
+        cache['resized'][max_width] = resized
+    return resized
+
+
+def get_live_resized(grabber, frame, seq, max_width):
+    """Liefert ein auf max_width verkleinertes Bild aus dem gemeinsamen Varianten-Cache"""
+    if max_width and frame.shape[1] <= max_width:
+        max_width = None
+    with grabber['encode_lock']:
+        return _cached_resize(grabber['jpeg_cache'], frame, seq, max_width)
+
+
+def get_camera_stream(camera_index, remote_addr=None, max_width=None, fps=None, quality=LIVE_JPEG_QUALITY):
+    """Generator für Video-Stream von einer Kamera (verwendet Sub-Stream für Live-Vorschau)
+    Alle Zuschauer einer Kamera teilen sich einen Grabber-Thread. Jeder Zuschauer holt das
+    neueste Bild aus seinem Postfach ab - ein langsamer Client verpasst Bilder, blockiert aber niemanden
+    max_width/fps/quality: gewünschte Variante, fps=None = Bildrate der Kamera"""
+    if not get_live_stream_url(camera_index):
+        return
+    
+    grabber, client = subscribe_live_grabber(camera_index, remote_addr)
+    client['variant'] = {'w': max_width, 'fps': fps, 'q': quality}
+    condition = grabber['condition']
+    frame_interval = 1.0 / fps if fps else 0
+    next_due = 0
+    
+    try:
+        while True:
+            if not client['event'].wait(timeout=LIVE_FRAME_TIMEOUT):
+                logger.warning(f"Kein neues Bild von Kamera {camera_index}, beende Live-Stream")
+                break
+            with condition:
+                slot = client['slot']
+                client['slot'] = None
+                client['event'].clear()
+            if slot is None:
+                if not grabber['running']:
+                    break
+                continue
+            
+            # Begrenzte Bildrate: Bilder vor dem nächsten Sendezeitpunkt auslassen
+            if frame_interval:
+                now = time.time()
+                if now < next_due:
+                    client['skipped'] += 1
+                    continue
+                next_due = max(next_due + frame_interval, now)
+            
+            # Konvertiere Frame zu JPEG (einmal pro Frame und Variante für alle Zuschauer)
+            seq, frame = slot
+            frame_bytes = get_live_jpeg(grabber, frame, seq, max_width, quality)
+            if frame_bytes:
+                # yield außerhalb aller Locks: ein blockierender Socket hält nur diesen Client auf
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+                client['sent'] += 1
+    finally:
+        unsubscribe_live_grabber(grabber, client)
 
 
 @app.route('/stream/<int:camera_index>')
 def video_stream(camera_index):
-    """MJPEG-Stream Endpoint für eine Kamera"""
-    return Response(get_camera_stream(camera_index),
+    """MJPEG-Stream Endpoint für eine Kamera
+    Optionale Parameter: ?w= maximale Breite, ?fps= Bildrate, ?q= JPEG-Qualität"""
+    from flask import request
+    max_width, fps, quality = parse_live_variant(request.args)
+    return Response(get_camera_stream(camera_index, request.remote_addr, max_width, fps, quality),
                     mimetype='multipart/x-mixed-replace; boundary=frame')
 
 
-def cleanup_captures():
-    """Schließt alle Video-Captures"""
-    for idx, cap in video_captures.items():
+@app.route('/stream/stats')
+def stream_stats():
+    """Gibt pro Kamera die Zuschauer der Live-Vorschau mit gesendeten und verworfenen Bildern zurück"""
+    stats = {}
+    with live_grabbers_lock:
+        grabbers = list(live_grabbers.items())
+    for idx, grabber in grabbers:
+        with grabber['condition']:
+            stats[idx] = {
+                'seq': grabber['seq'],
+                'grabbed': grabber['grabbed'],
+                'retrieved': grabber['retrieved'],
+                'clients': [{
+                    'id': client['id'],
+                    'remote': client['remote'],
+                    'connected': client['connected'].isoformat(),
+                    'variant': client['variant'],
+                    'sent': client['sent'],
+                    'dropped': client['dropped'],
+                    'skipped': client['skipped']
+                } for client in grabber['clients'].values()]
+            }
+    return stats
+
+
+def get_hls_root():
+    """Temporäres Verzeichnis für HLS-Segmente (wird beim ersten Aufruf angelegt)"""
+    global hls_root
+    if hls_root is None:
+        hls_root = tempfile.mkdtemp(prefix='kamera_hls_')
+    return hls_root
+
+
+def start_hls_session(camera_index):
+    """Startet FFmpeg, das den Sub-Stream ohne Neukodierung (-c:v copy) als HLS/fMP4 ausgibt"""
+    ffmpeg_avail, ffmpeg_cmd = check_ffmpeg()
+    stream_url = get_live_stream_url(camera_index)
+    if not ffmpeg_avail or not stream_url:
+        return None
+    
+    # Eigenes Verzeichnis pro Sitzung, damit das Aufräumen einer alten Sitzung die neue nicht trifft
+    session_dir = os.path.join(get_hls_root(), str(camera_index), uuid.uuid4().hex)
+    os.makedirs(session_dir, exist_ok=True)
+    
+    # -an: Live-Vorschau ohne Ton (G.711 o.ä. ist in fMP4 nicht abspielbar)
+    # independent_segments: jedes Segment beginnt mit einem Keyframe
+    ffmpeg_args = [
+        ffmpeg_cmd,
+        '-rtsp_transport', 'tcp',
+        '-i', stream_url,
+        '-c:v', 'copy',
+        '-an',
+        '-f', 'hls',
+        '-hls_time', str(HLS_SEGMENT_DURATION),
+        '-hls_list_size', str(HLS_LIST_SIZE),
+        '-hls_flags', 'delete_segments+independent_segments+omit_endlist',
+        '-hls_segment_type', 'fmp4',
+        '-hls_fmp4_init_filename', 'init.mp4',
+        '-hls_segment_filename', os.path.join(session_dir, 'seg_%05d.m4s'),
+        os.path.join(session_dir, 'index.m3u8')
+    ]
+    
+    try:
+        process = subprocess.Popen(
+            ffmpeg_args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+    except Exception as e:
+        logger.error(f"Fehler beim Starten der HLS-Vorschau für Kamera {camera_index}: {e}")
+        return None
+    
+    logger.info(f"HLS-Vorschau gestartet für Kamera {camera_index}")
+    return {
+        'process': process,
+        'dir': session_dir,
+        'stream_url': stream_url,
+        'last_access': time.time()
+    }
+
+
+def stop_hls_session(camera_index, session):
+    """Beendet den FFmpeg-Prozess einer HLS-Vorschau und löscht ihre Segmente"""
+    process = session['process']
+    try:
+        process.stdin.write(b'q\n')
+        process.stdin.flush()
+        process.wait(timeout=5)
+    except:
         try:
-            cap.release()
+            process.kill()
+            process.wait(timeout=2)
         except:
             pass
-    video_captures.clear()
-    capture_locks.clear()
+    shutil.rmtree(session['dir'], ignore_errors=True)
+    logger.info(f"HLS-Vorschau beendet für Kamera {camera_index}")
+
+
+def get_hls_session(camera_index):
+    """Gibt die laufende HLS-Vorschau einer Kamera zurück und startet sie bei Bedarf (neu)"""
+    stale = None
+    with hls_lock:
+        session = hls_sessions.get(camera_index)
+        if session is not None and (session['process'].poll() is not None
+                                    or session['stream_url'] != get_live_stream_url(camera_index)):
+            # FFmpeg abgestürzt oder Stream-URL nach einem Scan geändert
+            stale = hls_sessions.pop(camera_index)
+    # Alte Sitzung zuerst beenden, erst dann neu starten
+    if stale is not None:
+        stop_hls_session(camera_index, stale)
+    with hls_lock:
+        session = hls_sessions.get(camera_index)
+        if session is None:
+            session = start_hls_session(camera_index)
+            if session is not None:
+                hls_sessions[camera_index] = session
+        if session is not None:
+            session['last_access'] = time.time()
+    return session
+
+
+def hls_reaper_worker():
+    """Beendet HLS-Vorschauen, deren Playlist länger nicht mehr abgerufen wurde"""
+    while True:
+        time.sleep(HLS_IDLE_TIMEOUT / 3)
+        now = time.time()
+        with hls_lock:
+            idle = [(idx, session) for idx, session in hls_sessions.items()
+                    if now - session['last_access'] > HLS_IDLE_TIMEOUT]
+            for idx, _ in idle:
+                del hls_sessions[idx]
+        for idx, session in idle:
+            stop_hls_session(idx, session)
+
+
+@app.route('/hls/<int:camera_index>/<filename>')
+def hls_file(camera_index, filename):
+    """Liefert Playlist, Init-Segment und fMP4-Segmente der HLS-Live-Vorschau"""
+    from flask import send_from_directory
+    
+    if not HLS_FILE_PATTERN.match(filename) or camera_index >= len(found_cameras):
+        return {'error': 'Nicht gefunden'}, 404
+    
+    if filename == 'index.m3u8':
+        session = get_hls_session(camera_index)
+        if session is None:
+            return {'error': 'HLS nicht verfügbar'}, 404
+        # Beim Start dauert es bis zum ersten Segment
+        playlist = os.path.join(session['dir'], filename)
+        deadline = time.time() + HLS_START_TIMEOUT
+        while not os.path.exists(playlist) and time.time() < deadline and session['process'].poll() is None:
+            time.sleep(0.2)
+        mimetype = 'application/vnd.apple.mpegurl'
+    else:
+        with hls_lock:
+            session = hls_sessions.get(camera_index)
+        if session is None:
+            return {'error': 'Nicht gefunden'}, 404
+        mimetype = 'video/mp4' if filename.endswith('.mp4') else 'video/iso.segment'
+    
+    if not os.path.exists(os.path.join(session['dir'], filename)):
+        return {'error': 'Nicht gefunden'}, 404
+    response = send_from_directory(session['dir'], filename, mimetype=mimetype)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def get_live_snapshot(camera_index, max_width, quality, max_age):
+    """Letztes Bild eines laufenden Live-Grabbers (aus dem gemeinsamen JPEG-Cache)
+    Gibt (jpeg, etag, alter) zurück oder None, wenn kein ausreichend aktuelles Bild vorliegt"""
+    with live_grabbers_lock:
+        grabber = live_grabbers.get(camera_index)
+    if grabber is None or not grabber['running']:
+        return None
+    with grabber['condition']:
+        frame = grabber['frame']
+        seq = grabber['seq']
+        frame_time = grabber['frame_time']
+    if frame is None or time.time() - frame_time > max_age:
+        return None
+    
+    jpeg = get_live_jpeg(grabber, frame, seq, max_width, quality)
+    if not jpeg:
+        return None
+    etag = f'"live-{camera_index}-{id(grabber):x}-{seq}-{max_width or 0}-{quality}"'
+    return jpeg, etag, time.time() - frame_time
+
+
+def fetch_onvif_snapshot(camera_index, max_width, quality, max_age):
+    """Holt ein Einzelbild über ONVIF GetSnapshotUri (ohne RTSP-Sitzung) und cached es max_age Sekunden
+    quality=None: Bild der Kamera unverändert (nur bei ?w= neu kodiert), sonst mit dieser Qualität neu kodiert
+    Gibt (jpeg, etag, alter) zurück oder None"""
+    camera = found_cameras[camera_index]
+    host = camera.get('host')
+    port = camera.get('port')
+    token = camera.get('sub_profile_token') or camera.get('main_profile_token')
+    if camera.get('online') is False or host_blocked(host, port):
+        return None
+    
+    with snapshot_lock:
+        fetch_lock = snapshot_locks.setdefault(camera_index, threading.Lock())
+    
+    with fetch_lock:
+        entry = snapshot_cache.get(camera_index)
+        if entry is None or entry['token'] != token:
+            entry = {'uri': None, 'token': token, 'jpeg': None, 'time': 0, 'etag': None, 'variants': {}}
+            snapshot_cache[camera_index] = entry
+        
+        if entry['jpeg'] is None or time.time() - entry['time'] > max_age:
+            with credentials_lock:
+                username = camera_username
+                password = camera_password
+            try:
+                if entry['uri'] is None:
+                    onvif_camera = get_onvif_camera(host, port, username, password)
+                    media_service = onvif_camera.create_media_service()
+                    request_token = {'ProfileToken': token} if token else {'ProfileToken': media_service.GetProfiles()[0].token}
+                    entry['uri'] = media_service.GetSnapshotUri(request_token).Uri
+                
+                # Gleiche gepoolte HTTP-Session wie für ONVIF; Kameras verlangen Digest oder Basic
+                session = get_onvif_transport(host, port).session
+                response = session.get(entry['uri'], timeout=SOAP_TIMEOUT,
+                                       auth=requests.auth.HTTPDigestAuth(username, password))
+                if response.status_code == 401:
+                    response = session.get(entry['uri'], timeout=SOAP_TIMEOUT,
+                                           auth=requests.auth.HTTPBasicAuth(username, password))
+                response.raise_for_status()
+                if not response.content:
+                    raise ValueError("Leere Antwort")
+            except Exception as e:
+                logger.warning(f"ONVIF-Snapshot von Kamera {camera_index} ({host}:{port}) fehlgeschlagen: {e}")
+                entry['uri'] = None
+                return None
+            
+            entry['jpeg'] = response.content
+            entry['time'] = time.time()
+            entry['etag'] = hashlib.sha1(response.content).hexdigest()[:16]
+            entry['variants'] = {}
+        
+        jpeg = entry['jpeg']
+        variant = (max_width, quality)
+        if max_width or quality is not None:
+            if variant not in entry['variants']:
+                image = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+                resize = image is not None and max_width and image.shape[1] > max_width
+                if image is not None and (resize or quality is not None):
+                    ret, buffer = cv2.imencode('.jpg', resize_to_width(image, max_width),
+                                               [cv2.IMWRITE_JPEG_QUALITY, quality or LIVE_JPEG_QUALITY])
+                    entry['variants'][variant] = buffer.tobytes() if ret else jpeg
+                else:
+                    entry['variants'][variant] = jpeg
+            jpeg = entry['variants'][variant]
+        etag = f'"onvif-{camera_index}-{entry["etag"]}-{max_width or 0}-{quality or 0}"'
+        return jpeg, etag, time.time() - entry['time']
+
+
+@app.route('/snapshot/<int:camera_index>')
+def snapshot(camera_index):
+    """Aktuelles Einzelbild einer Kamera als JPEG
+    Optionale Parameter: ?w= maximale Breite, ?q= JPEG-Qualität, ?max_age= maximales Alter in Sekunden
+    Unterstützt ETag/If-None-Match - unverändertes Bild = 304 ohne Inhalt"""
+    from flask import request
+    
+    if camera_index >= len(found_cameras):
+        return {'error': 'Kamera nicht gefunden'}, 404
+    
+    max_width, _, quality = parse_live_variant(request.args)
+    max_age = request.args.get('max_age', type=float)
+    if max_age is None:
+        max_age = SNAPSHOT_MAX_AGE
+    max_age = max(SNAPSHOT_MAX_AGE_MIN, min(SNAPSHOT_MAX_AGE_LIMIT, max_age))
+    
+    # Läuft ohnehin eine Live-Vorschau, kostet das Bild nur einen Cache-Zugriff
+    result = get_live_snapshot(camera_index, max_width, quality, max_age)
+    if result is None:
+        # Ohne ?q= wird das Kamerabild nicht unnötig neu kodiert
+        onvif_quality = quality if 'q' in request.args else None
+        result = fetch_onvif_snapshot(camera_index, max_width, onvif_quality, max_age)
+    if result is None:
+        return {'error': 'Kein Bild verfügbar'}, 503
+    
+    jpeg, etag, age = result
+    headers = {
+        'ETag': etag,
+        'Cache-Control': f'max-age={max(0, int(max_age - age))}',
+        'Age': str(int(age))
+    }
+    if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+        return Response(status=304, headers=headers)
+    return Response(jpeg, mimetype='image/jpeg', headers=headers)
+
+
+def parse_mosaic_layout(args):
+    """Liest die Mosaik-Parameter: ?cams=0,2,5 ?cols= ?w= ?fps= ?q=
+    Gibt (kamera_indizes, spalten, kachel_breite, kachel_höhe, fps, qualität) zurück"""
+    cams_param = args.get('cams', '')
+    if cams_param:
+        camera_indices = []
+        for part in cams_param.split(','):
+            part = part.strip()
+            if part.isdigit() and int(part) < len(found_cameras) and int(part) not in camera_indices:
+                camera_indices.append(int(part))
+    else:
+        camera_indices = [idx for idx in range(len(found_cameras)) if get_live_stream_url(idx)]
+    
+    count = max(1, len(camera_indices))
+    cols = args.get('cols', type=int) or int(math.ceil(math.sqrt(count)))
+    cols = max(1, min(count, cols))
+    
+    width = args.get('w', type=int) or MOSAIC_DEFAULT_WIDTH
+    width = max(LIVE_MIN_WIDTH, min(LIVE_MAX_WIDTH, width))
+    tile_width = max(16, width // cols)
+    tile_height = max(9, int(tile_width / MOSAIC_TILE_ASPECT))
+    
+    _, fps, quality = parse_live_variant(args)
+    return camera_indices, cols, tile_width, tile_height, fps or MOSAIC_DEFAULT_FPS, quality
+
+
+def draw_mosaic_tile(canvas, frame, x, y, tile_width, tile_height, label):
+    """Zeichnet ein Bild zentriert (Seitenverhältnis erhalten) in seine Kachel und beschriftet sie"""
+    canvas[y:y + tile_height, x:x + tile_width] = 0
+    if frame is not None:
+        height, width = frame.shape[:2]
+        if width > tile_width or height > tile_height:
+            scale = min(tile_width / width, tile_height / height)
+            frame = cv2.resize(frame, (max(1, int(width * scale)), max(1, int(height * scale))),
+                               interpolation=cv2.INTER_AREA)
+            height, width = frame.shape[:2]
+        offset_x = x + (tile_width - width) // 2
+        offset_y = y + (tile_height - height) // 2
+        canvas[offset_y:offset_y + height, offset_x:offset_x + width] = frame
+    else:
+        label = f"{label} (kein Bild)"
+    cv2.putText(canvas, label, (x + 6, y + 18), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1, cv2.LINE_AA)
+
+
+def get_mosaic_stream(camera_indices, cols, tile_width, tile_height, fps, quality, remote_addr=None):
+    """Generator für einen Mosaik-MJPEG-Stream: setzt die letzten Bilder mehrerer Kameras
+    in festem Takt zu einem Bild zusammen - eine Verbindung pro Wand-Display statt einer pro Kamera"""
+    rows = int(math.ceil(max(1, len(camera_indices)) / cols))
+    canvas = np.zeros((rows * tile_height, cols * tile_width, 3), dtype=np.uint8)
+    
+    # Jede Kachel ist ein normaler Zuschauer des Grabbers (Postfach mit dem neuesten Bild)
+    tiles = []
+    for position, camera_index in enumerate(camera_indices):
+        grabber, client = subscribe_live_grabber(camera_index, f"{remote_addr} (Mosaik)")
+        client['variant'] = {'w': tile_width, 'fps': fps, 'q': None}
+        tiles.append({
+            'camera_index': camera_index,
+            'grabber': grabber,
+            'client': client,
+            'x': (position % cols) * tile_width,
+            'y': (position // cols) * tile_height,
+            'label': found_cameras[camera_index].get('name') or found_cameras[camera_index].get('host', ''),
+            'seq': None
+        })
+    
+    frame_interval = 1.0 / fps
+    next_tick = time.time()
+    frame_bytes = None
+    
+    try:
+        while True:
+            changed = frame_bytes is None
+            for tile in tiles:
+                with tile['grabber']['condition']:
+                    slot = tile['client']['slot']
+                    tile['client']['slot'] = None
+                    tile['client']['event'].clear()
+                if slot is not None:
+                    seq, frame = slot
+                    tile['seq'] = seq
+                    draw_mosaic_tile(canvas, get_live_resized(tile['grabber'], frame, seq, tile_width),
+                                     tile['x'], tile['y'], tile_width, tile_height, tile['label'])
+                    changed = True
+                elif tile['seq'] is None and frame_bytes is None:
+                    draw_mosaic_tile(canvas, None, tile['x'], tile['y'], tile_width, tile_height, tile['label'])
+            
+            # Nur neu kodieren, wenn sich mindestens eine Kachel geändert hat
+            if changed:
+                ret, buffer = cv2.imencode('.jpg', canvas, [cv2.IMWRITE_JPEG_QUALITY, quality])
+                if ret:
+                    frame_bytes = buffer.tobytes()
+            if frame_bytes:
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+                for tile in tiles:
+                    tile['client']['sent'] += 1
+            
+            next_tick = max(next_tick + frame_interval, time.time())
+            time.sleep(max(0, next_tick - time.time()))
+    finally:
+        for tile in tiles:
+            unsubscribe_live_grabber(tile['grabber'], tile['client'])
+
+
+@app.route('/mosaic')
+def mosaic_stream():
+    """Mosaik-MJPEG-Stream mehrerer Kameras in einem Bild
+    Optionale Parameter: ?cams=0,1,2 ?cols= Spalten ?w= Gesamtbreite ?fps= Bildrate ?q= JPEG-Qualität"""
+    from flask import request
+    camera_indices, cols, tile_width, tile_height, fps, quality = parse_mosaic_layout(request.args)
+    if not camera_indices:
+        return {'error': 'Keine Kameras für das Mosaik'}, 404
+    rows = int(math.ceil(len(camera_indices) / cols))
+    if rows * tile_height * cols * tile_width > MOSAIC_MAX_PIXELS:
+        return {'error': f'Mosaik zu groß ({cols * tile_width}x{rows * tile_height}, '
+                         f'max. {MOSAIC_MAX_PIXELS} Pixel) - weniger Breite oder mehr Spalten wählen'}, 400
+    return Response(get_mosaic_stream(camera_indices, cols, tile_width, tile_height, fps, quality, request.remote_addr),
+                    mimetype='multipart/x-mixed-replace; boundary=frame')
+
+
+def cleanup_captures():
+    """Beendet alle Live-Grabber (die Threads geben ihr VideoCapture selbst frei), den Worker-Pool und HLS-Vorschauen"""
+    with live_grabbers_lock:
+        grabbers = list(live_grabbers.values())
+        live_grabbers.clear()
+    for grabber in grabbers:
+        grabber['running'] = False
+    for grabber in grabbers:
+        if grabber['thread'] is not threading.current_thread():
+            grabber['thread'].join(timeout=2)
+    stop_live_pool()
+    
+    with hls_lock:
+        sessions = list(hls_sessions.items())
+        hls_sessions.clear()
+    for idx, session in sessions:
+        stop_hls_session(idx, session)
 
 
 def cleanup_recordings():
-    """Schließt alle laufenden Aufnahmen sauber"""
+    """Schließt alle laufenden Aufnahmen sauber (alle Kameras gleichzeitig)"""
     logger.info("Schließe alle laufenden Aufnahmen...")
-    for camera_index in list(recording_status.keys()):
-        try:
-            status = recording_status[camera_index]
-            if status['recording']:
-                status['recording'] = False
-                
-                # Stoppe FFmpeg-Prozess falls aktiv
-                if 'ffmpeg_process' in status and status['ffmpeg_process'] is not None:
-                    try:
-                        process = status['ffmpeg_process']
-                        process.stdin.write(b'q\n')
-                        process.stdin.flush()
-                        process.wait(timeout=5)
-                    except:
-                        try:
-                            process.terminate()
-                            process.wait(timeout=2)
-                        except:
-                            try:
-                                process.kill()
-                            except:
-                                pass
-                
-                # Warte kurz, damit Thread sauber beendet wird
-                time.sleep(0.5)
-                
-                # Schließe Writer explizit (OpenCV)
-                if 'writer' in status and status['writer'] is not None:
-                    try:
-                        status['writer'].release()
-                        logger.info(f"Aufnahme geschlossen: {status.get('filename', 'unbekannt')}")
-                    except:
-                        pass
-                
-                # Schließe Video-Capture
-                if 'cap' in status and status['cap'] is not None:
-                    try:
-                        status['cap'].release()
-                    except:
-                        pass
-        except Exception as e:
-            logger.error(f"Fehler beim Schließen der Aufnahme {camera_index}: {e}")
+    try:
+        stop_recordings(list(recording_status.keys()))
+    except Exception as e:
+        logger.error(f"Fehler beim Schließen der Aufnahmen: {e}")
     
     recording_status.clear()
     recording_locks.clear()
@@ -2499,6 +5096,11 @@ if __name__ == '__main__':
     # Lade Konfiguration beim Start
     load_config()
     
+    # Thread-Modus: OpenCV verteilt Dekodierung/Skalierung intern auf live_workers Threads
+    if live_worker_mode == 'threads' and live_workers:
+        cv2.setNumThreads(live_workers)
+    logger.info(f"Live-Vorschau: Worker-Modus '{live_worker_mode}', {live_workers or os.cpu_count()} Worker")
+    
     # Starte Cleanup-Worker für automatisches Löschen alter Aufnahmen (24h)
     cleanup_thread = threading.Thread(target=cleanup_worker, daemon=True)
     cleanup_thread.start()
@@ -2513,30 +5115,50 @@ if __name__ == '__main__':
     print("ONVIF Camera Viewer")
     print("=" * 60)
     print("\nStarte Web-Server auf http://localhost:8080")
-    print("\nDie Kameras werden auf Ports 888 und 835 gescannt")
+    print(f"\nDie Kameras werden in {', '.join(get_scan_networks())} auf Ports {', '.join(map(str, get_scan_ports()))} gescannt")
     print("Nur Kameras mit admin/123456 werden angezeigt")
     print("\nAufnahmen werden im Ordner 'aufnahmen' gespeichert")
     print("Format: aufnahmen/YYYY-MM-DD/HH-MM_HH-MM/IP_PORT_YYYY-MM-DD_HH-MM-SS.mp4")
     print("\n⚠️  WICHTIG: Beim Beenden (Ctrl+C) werden alle Dateien sauber geschlossen!")
-    print("\nStarte automatischen Scan beim Serverstart...")
-    print("=" * 60)
     
-    # Automatischer Scan beim Start
-    try:
-        cameras = scan_network()
-        print(f"\n✓ Scan abgeschlossen: {len(cameras)} Kamera(s) gefunden")
-        if cameras:
-            print("✓ Automatische Aufnahmen gestartet für alle Kameras")
-        else:
-            print("⚠ Keine Kameras gefunden - bitte manuell scannen über Web-Interface")
-    except Exception as e:
-        logger.error(f"Fehler beim automatischen Scan: {e}")
-        print(f"⚠ Fehler beim automatischen Scan: {e}")
+    # Bekannte Kameras aus der Registry: Aufnahmen sofort fortsetzen, Revalidierung im Hintergrund
+    registry_cameras = load_camera_registry()
+    if registry_cameras:
+        print(f"\nSetze Aufnahmen für {len(registry_cameras)} bekannte Kamera(s) aus der Registry fort...")
+        print("=" * 60)
+        merge_found_cameras(registry_cameras)
+        start_all_recordings()
+        print("✓ Automatische Aufnahmen gestartet, Kameras werden im Hintergrund geprüft")
+        revalidate_thread = threading.Thread(target=revalidate_registry, daemon=True)
+        revalidate_thread.start()
+    else:
+        print("\nStarte automatischen Scan beim Serverstart...")
+        print("=" * 60)
+        
+        # Automatischer Scan beim Start
+        try:
+            cameras = scan_network()
+            print(f"\n✓ Scan abgeschlossen: {len(cameras)} Kamera(s) gefunden")
+            if cameras:
+                print("✓ Automatische Aufnahmen gestartet für alle Kameras")
+            else:
+                print("⚠ Keine Kameras gefunden - bitte manuell scannen über Web-Interface")
+        except Exception as e:
+            logger.error(f"Fehler beim automatischen Scan: {e}")
+            print(f"⚠ Fehler beim automatischen Scan: {e}")
     
     print("\n" + "=" * 60)
     print("Web-Server läuft auf http://localhost:8080")
     print("=" * 60 + "\n")
     
+    # Präsenz-Monitor für bekannte und neue Kameras
+    presence_thread = threading.Thread(target=presence_monitor_worker, daemon=True)
+    presence_thread.start()
+    logger.info(f"Präsenz-Monitor gestartet: Prüft Kameras alle {PRESENCE_CHECK_INTERVAL}s")
+    
+    # Beendet ungenutzte HLS-Live-Vorschauen
+    threading.Thread(target=hls_reaper_worker, daemon=True).start()
+    
     # URL für Dashboard
     dashboard_url = 'http://localhost:8080'
     
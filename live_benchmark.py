@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Live-Benchmark - Misst die Skalierung der Live-Vorschau (Dekodieren + JPEG-Kodieren)
+
+Erzeugt ein synthetisches Testvideo und lässt N simulierte Kameras darauf zeigen (jede mit
+eigenem Capture, in Echtzeit getaktet). Pro Kamera holt ein Zuschauer den MJPEG-Stream in
+voller Bildrate ab. Gemessen werden je Worker-Modus ('threads' / 'processes') und Kamera-Anzahl:
+ausgelieferte Bildrate pro Kamera, CPU-Zeit (Hauptprozess + Worker-Prozesse) und genutzte Kerne.
+Läuft komplett offline.
+
+Beispiel:
+    python live_benchmark.py --cameras 4,16,32 --modes threads,processes --seconds 10
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+def create_test_video(path, width, height, fps, seconds):
+    """Schreibt ein bewegtes Testbild (MPEG-4), damit Dekodieren und Kodieren realistisch Arbeit haben"""
+    import cv2
+    import numpy as np
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError("Testvideo konnte nicht geschrieben werden (mp4v-Codec nicht verfügbar)")
+    gradient = np.tile(np.linspace(0, 255, width, dtype=np.uint8), (height, 1))
+    for i in range(int(fps * seconds)):
+        frame = np.dstack([np.roll(gradient, i * 4, axis=1), np.roll(gradient, -i * 2, axis=1), gradient])
+        cv2.putText(frame, f"Frame {i}", (20, height // 2), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+        writer.write(frame)
+    writer.release()
+
+
+def process_cpu_seconds(pid):
+    """CPU-Zeit (user + system) eines laufenden Prozesses aus /proc, None wenn nicht verfügbar"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def worker_cpu_seconds(cv):
+    """Summe der CPU-Zeit aller Worker-Prozesse des Live-Pools (0 im Thread-Modus)"""
+    pool = cv.live_pool
+    if pool is None:
+        return 0.0
+    total = 0.0
+    for process in pool['processes']:
+        seconds = process_cpu_seconds(process.pid)
+        if seconds is None:
+            return None
+        total += seconds
+    return total
+
+
+def run_viewers(cv, cameras, warmup, seconds, view_width=None):
+    """Startet einen Zuschauer pro Kamera und zählt die ausgelieferten Bilder im Messfenster
+    view_width: angefragte Breite wie beim Dashboard (/stream/N?w=...)"""
+    counts = [0] * cameras
+    first_frame = [threading.Event() for _ in range(cameras)]
+    running = [True]
+
+    def viewer(idx):
+        stream = cv.get_camera_stream(idx, f'benchmark-{idx}', max_width=view_width)
+        try:
+            for _ in stream:
+                counts[idx] += 1
+                first_frame[idx].set()
+                if not running[0]:
+                    break
+        finally:
+            stream.close()
+
+    threads = [threading.Thread(target=viewer, args=(idx,), daemon=True) for idx in range(cameras)]
+    for thread in threads:
+        thread.start()
+
+    deadline = time.time() + warmup + 30
+    for event in first_frame:
+        event.wait(timeout=max(0, deadline - time.time()))
+    time.sleep(warmup)
+
+    start_counts = list(counts)
+    main_cpu_start = time.process_time()
+    worker_cpu_start = worker_cpu_seconds(cv)
+    wall_start = time.perf_counter()
+    time.sleep(seconds)
+    wall_time = time.perf_counter() - wall_start
+    main_cpu = time.process_time() - main_cpu_start
+    worker_cpu_end = worker_cpu_seconds(cv)
+    frames = [counts[idx] - start_counts[idx] for idx in range(cameras)]
+
+    running[0] = False
+    for thread in threads:
+        thread.join(timeout=5)
+
+    worker_cpu = None
+    if worker_cpu_start is not None and worker_cpu_end is not None:
+        worker_cpu = worker_cpu_end - worker_cpu_start
+    return frames, wall_time, main_cpu, worker_cpu
+
+
+def run_benchmark(args):
+    import camera_viewer as cv
+
+    cv.logger.setLevel('WARNING')
+    source = args.source
+    if source is None:
+        source = os.path.join(tempfile.mkdtemp(prefix='live_benchmark_'), 'test.mp4')
+        create_test_video(source, args.width, args.height, args.fps, args.warmup + args.seconds + 15)
+
+    results = []
+    for mode in args.modes:
+        for cameras in args.cameras:
+            cv.live_worker_mode = mode
+            cv.live_workers = args.workers
+            cv.live_grace_period = 0
+            cv.found_cameras[:] = [{'host': f'benchmark-{i}', 'port': 0, 'name': f'Benchmark {i}',
+                                    'live_stream_url': source} for i in range(cameras)]
+
+            frames, wall_time, main_cpu, worker_cpu = run_viewers(cv, cameras, args.warmup, args.seconds,
+                                                                  args.view_width or None)
+            cv.cleanup_captures()
+
+            cpu_time = main_cpu + (worker_cpu or 0)
+            fps = [count / wall_time for count in frames]
+            results.append({
+                'mode': mode,
+                'cameras': cameras,
+                'workers': args.workers or os.cpu_count(),
+                'fps_min': round(min(fps), 1),
+                'fps_avg': round(sum(fps) / len(fps), 1),
+                'frames_total': sum(frames),
+                'cpu_main': round(main_cpu, 2),
+                'cpu_workers': round(worker_cpu, 2) if worker_cpu is not None else None,
+                'cores_used': round(cpu_time / wall_time, 2),
+                'cpu_ms_per_frame': round(cpu_time * 1000 / max(sum(frames), 1), 2)
+            })
+    return results
+
+
+def print_results(results):
+    print(f"{'Modus':<10} {'Kameras':>7} {'Worker':>6} {'FPS min':>8} {'FPS avg':>8} {'CPU Haupt':>10} "
+          f"{'CPU Worker':>11} {'Kerne':>6} {'ms/Bild':>8}")
+    print('-' * 84)
+    for r in results:
+        worker_cpu = f"{r['cpu_workers']:.2f}" if r['cpu_workers'] is not None else 'n/a'
+        print(f"{r['mode']:<10} {r['cameras']:>7} {r['workers']:>6} {r['fps_min']:>8.1f} {r['fps_avg']:>8.1f} "
+              f"{r['cpu_main']:>10.2f} {worker_cpu:>11} {r['cores_used']:>6.2f} {r['cpu_ms_per_frame']:>8.2f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark der Live-Vorschau mit simulierten Kameras")
+    parser.add_argument('--cameras', default='4,16,32', help="Kommagetrennte Kamera-Anzahlen")
+    parser.add_argument('--modes', default='threads,processes', help="Worker-Modi: threads, processes")
+    parser.add_argument('--workers', type=int, default=0, help="Worker-Prozesse bzw. OpenCV-Threads (0 = CPU-Kerne)")
+    parser.add_argument('--seconds', type=float, default=10, help="Dauer des Messfensters in Sekunden")
+    parser.add_argument('--warmup', type=float, default=3, help="Einlaufzeit vor der Messung in Sekunden")
+    parser.add_argument('--width', type=int, default=640, help="Breite des Testvideos")
+    parser.add_argument('--height', type=int, default=360, help="Höhe des Testvideos")
+    parser.add_argument('--fps', type=int, default=25, help="Bildrate des Testvideos")
+    parser.add_argument('--view-width', type=int, default=480,
+                        help="Angefragte Bildbreite wie beim Dashboard (?w=), 0 = Originalbreite")
+    parser.add_argument('--source', help="Eigene Videodatei oder Stream-URL statt Testvideo")
+    parser.add_argument('--json', action='store_true', help="Ergebnisse als JSON ausgeben")
+    args = parser.parse_args()
+    args.cameras = [int(c) for c in args.cameras.split(',') if c.strip()]
+    args.modes = [m.strip() for m in args.modes.split(',') if m.strip()]
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    results = run_benchmark(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
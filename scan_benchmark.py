@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Scan-Benchmark - Misst Kamera-Erkennung gegen eine simulierte ONVIF-Kameraflotte
+
+Startet N lokale Fake-ONVIF-Kameras auf Loopback-Adressen (127.0.0.2, 127.0.0.3, ...)
+in einem eigenen Prozess und misst scan_network, scan_camera und get_stream_uri:
+Wall-Zeit, SOAP-Aufrufe pro Kamera, Thread-Anzahl und CPU-Zeit je Worker-Anzahl.
+Läuft komplett offline.
+
+Linux: alle Adressen 127.0.0.0/8 sind ohne Konfiguration erreichbar.
+macOS: Loopback-Aliase vorher anlegen, z.B. für 20 Kameras:
+    for i in $(seq 2 21); do sudo ifconfig lo0 alias 127.0.0.$i up; done
+
+Beispiel:
+    python scan_benchmark.py --cameras 50 --latency 0.02 --profiles 3 --auth-failures 5 --workers 4,16,64
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SOAP_ENVELOPE = """<?xml version="1.0" encoding="UTF-8"?>
+<s:Envelope xmlns:s="http://www.w3.org/2003/05/soap-envelope"
+            xmlns:tds="http://www.onvif.org/ver10/device/wsdl"
+            xmlns:trt="http://www.onvif.org/ver10/media/wsdl"
+            xmlns:tt="http://www.onvif.org/ver10/schema"
+            xmlns:ter="http://www.onvif.org/ver10/error">
+    <s:Body>{body}</s:Body>
+</s:Envelope>"""
+
+SOAP_FAULT_NOT_AUTHORIZED = """<s:Fault>
+    <s:Code><s:Value>s:Sender</s:Value><s:Subcode><s:Value>ter:NotAuthorized</s:Value></s:Subcode></s:Code>
+    <s:Reason><s:Text xml:lang="en">Sender not Authorized</s:Text></s:Reason>
+</s:Fault>"""
+
+# Auflösungen der simulierten Profile (höchste zuerst, wie bei echten Kameras)
+PROFILE_RESOLUTIONS = [(2560, 1440), (1920, 1080), (1280, 720), (640, 360), (352, 288)]
+
+
+def build_profile(index, resolution, element='trt:Profiles'):
+    """Erzeugt ein Media-Profil mit eingebetteter VideoEncoderConfiguration"""
+    width, height = resolution
+    return f"""<{element} token="profile_{index}" fixed="true">
+        <tt:Name>Profile {index}</tt:Name>
+        {build_encoder_config(index, resolution)}
+    </{element}>"""
+
+
+def build_encoder_config(index, resolution, element='tt:VideoEncoderConfiguration'):
+    width, height = resolution
+    return f"""<{element} token="encoder_{index}">
+            <tt:Name>Encoder {index}</tt:Name>
+            <tt:UseCount>1</tt:UseCount>
+            <tt:Encoding>H264</tt:Encoding>
+            <tt:Resolution><tt:Width>{width}</tt:Width><tt:Height>{height}</tt:Height></tt:Resolution>
+            <tt:Quality>5</tt:Quality>
+            <tt:RateControl>
+                <tt:FrameRateLimit>25</tt:FrameRateLimit>
+                <tt:EncodingInterval>1</tt:EncodingInterval>
+                <tt:BitrateLimit>{width * height // 512}</tt:BitrateLimit>
+            </tt:RateControl>
+            <tt:SessionTimeout>PT60S</tt:SessionTimeout>
+        </{element}>"""
+
+
+def make_handler(camera, counters, counters_lock):
+    """Erzeugt einen HTTP-Handler für eine simulierte Kamera"""
+    host, port = camera['host'], camera['port']
+    profiles = [PROFILE_RESOLUTIONS[i % len(PROFILE_RESOLUTIONS)] for i in range(camera['profiles'])]
+
+    def respond_to(action, request_root):
+        if action == 'GetSystemDateAndTime':
+            return """<tds:GetSystemDateAndTimeResponse><tds:SystemDateAndTime>
+                <tt:DateTimeType>NTP</tt:DateTimeType><tt:DaylightSavings>false</tt:DaylightSavings>
+            </tds:SystemDateAndTime></tds:GetSystemDateAndTimeResponse>"""
+        if camera['auth_failure']:
+            return None
+        if action == 'GetCapabilities':
+            return f"""<tds:GetCapabilitiesResponse><tds:Capabilities>
+                <tt:Device><tt:XAddr>http://{host}:{port}/onvif/device_service</tt:XAddr></tt:Device>
+                <tt:Media><tt:XAddr>http://{host}:{port}/onvif/media_service</tt:XAddr></tt:Media>
+            </tds:Capabilities></tds:GetCapabilitiesResponse>"""
+        if action == 'GetDeviceInformation':
+            return f"""<tds:GetDeviceInformationResponse>
+                <tds:Manufacturer>Benchmark</tds:Manufacturer><tds:Model>FakeCam {host}</tds:Model>
+                <tds:FirmwareVersion>1.0</tds:FirmwareVersion><tds:SerialNumber>{host}</tds:SerialNumber>
+                <tds:HardwareId>1</tds:HardwareId>
+            </tds:GetDeviceInformationResponse>"""
+        if action == 'GetProfiles':
+            body = ''.join(build_profile(i, res) for i, res in enumerate(profiles))
+            return f"<trt:GetProfilesResponse>{body}</trt:GetProfilesResponse>"
+        if action == 'GetVideoEncoderConfiguration':
+            token = request_root.findtext('.//{http://www.onvif.org/ver10/media/wsdl}ConfigurationToken') or 'encoder_0'
+            index = int(token.rsplit('_', 1)[-1]) if token.rsplit('_', 1)[-1].isdigit() else 0
+            config = build_encoder_config(index, profiles[min(index, len(profiles) - 1)], 'trt:Configuration')
+            return f"<trt:GetVideoEncoderConfigurationResponse>{config}</trt:GetVideoEncoderConfigurationResponse>"
+        if action == 'GetStreamUri':
+            token = request_root.findtext('.//{http://www.onvif.org/ver10/media/wsdl}ProfileToken') or 'profile_0'
+            return f"""<trt:GetStreamUriResponse><trt:MediaUri>
+                <tt:Uri>rtsp://{host}:554/{token}</tt:Uri>
+                <tt:InvalidAfterConnect>false</tt:InvalidAfterConnect>
+                <tt:InvalidAfterReboot>false</tt:InvalidAfterReboot>
+                <tt:Timeout>PT0S</tt:Timeout>
+            </trt:MediaUri></trt:GetStreamUriResponse>"""
+        return None
+
+    class FakeOnvifHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            data = self.rfile.read(length)
+            try:
+                root = ET.fromstring(data)
+                body = root.find('{http://www.w3.org/2003/05/soap-envelope}Body')
+                action = body[0].tag.split('}')[-1] if body is not None and len(body) else 'Unknown'
+            except ET.ParseError:
+                root, action = None, 'Invalid'
+
+            with counters_lock:
+                counters[action] += 1
+
+            if camera['latency']:
+                time.sleep(camera['latency'])
+
+            response = respond_to(action, root)
+            status = 200
+            if response is None:
+                response, status = SOAP_FAULT_NOT_AUTHORIZED, 400
+            payload = SOAP_ENVELOPE.format(body=response).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/soap+xml; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeOnvifHandler
+
+
+def run_fleet(cameras, conn):
+    """Prozess der simulierten Flotte: startet alle Server und beantwortet Steuerbefehle über die Pipe"""
+    counters = Counter()
+    counters_lock = threading.Lock()
+    servers = []
+    for camera in cameras:
+        server = ThreadingHTTPServer((camera['host'], camera['port']), make_handler(camera, counters, counters_lock))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    conn.send('ready')
+
+    while True:
+        command = conn.recv()
+        if command == 'stats':
+            with counters_lock:
+                conn.send(dict(counters))
+        elif command == 'reset':
+            with counters_lock:
+                counters.clear()
+            conn.send('ok')
+        elif command == 'stop':
+            for server in servers:
+                server.shutdown()
+            conn.send('ok')
+            return
+
+
+def start_fleet(args):
+    """Startet die simulierte Flotte in einem eigenen Prozess (CPU-Messung betrifft nur den Scanner)"""
+    cameras = [{
+        'host': f"{args.network}.{2 + i}",
+        'port': args.port,
+        'latency': args.latency,
+        'profiles': args.profiles,
+        'auth_failure': i < args.auth_failures
+    } for i in range(args.cameras)]
+
+    parent_conn, child_conn = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=run_fleet, args=(cameras, child_conn), daemon=True)
+    process.start()
+    if not parent_conn.poll(30) or parent_conn.recv() != 'ready':
+        raise RuntimeError("Simulierte Kameraflotte konnte nicht gestartet werden")
+    return process, parent_conn
+
+
+def fleet_command(conn, command):
+    conn.send(command)
+    return conn.recv()
+
+
+def reset_scanner_state(cv):
+    """Setzt alle Caches des Scanners zurück, damit jeder Durchlauf kalt startet"""
+    cv.found_cameras.clear()
+    cv.onvif_cameras.clear()
+    cv.onvif_transports.clear()
+    cv.wsdl_documents.clear()
+    cv.rtt_stats.clear()
+    cv.host_rtt_stats.clear()
+    cv.host_failures.clear()
+
+
+def measure(func):
+    """Führt func aus und misst Wall-Zeit, CPU-Zeit und maximale Thread-Anzahl"""
+    peak_threads = [threading.active_count()]
+    running = [True]
+
+    def sample_threads():
+        while running[0]:
+            peak_threads[0] = max(peak_threads[0], threading.active_count())
+            time.sleep(0.005)
+
+    sampler = threading.Thread(target=sample_threads, daemon=True)
+    sampler.start()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    result = func()
+    cpu_time = time.process_time() - cpu_start
+    wall_time = time.perf_counter() - wall_start
+    running[0] = False
+    sampler.join()
+    # Der Sampler-Thread selbst zählt nicht mit
+    return result, wall_time, cpu_time, peak_threads[0] - 1
+
+
+def run_benchmark(args):
+    import camera_viewer as cv
+
+    cv.logger.setLevel('WARNING')
+    cv.CAMERA_REGISTRY_FILE = os.path.join(tempfile.mkdtemp(prefix='scan_benchmark_'), 'cameras.json')
+
+    process, conn = start_fleet(args)
+    expected = args.cameras - args.auth_failures
+    results = []
+    try:
+        for workers in args.workers:
+            cv.ONVIF_MAX_WORKERS = workers
+            reset_scanner_state(cv)
+            fleet_command(conn, 'reset')
+
+            cameras, wall_time, cpu_time, threads = measure(
+                lambda: cv.scan_network(args.username, args.password, ports=[args.port],
+                                        mode='sweep', auto_record=False,
+                                        networks=[f"{args.network}.0/24"]))
+            calls = fleet_command(conn, 'stats')
+            total_calls = sum(calls.values())
+            results.append({
+                'benchmark': 'scan_network',
+                'workers': workers,
+                'cameras_found': len(cameras),
+                'cameras_expected': expected,
+                'wall_time': round(wall_time, 3),
+                'cpu_time': round(cpu_time, 3),
+                'peak_threads': threads,
+                'soap_calls_total': total_calls,
+                'soap_calls_per_camera': round(total_calls / max(args.cameras, 1), 2),
+                'soap_calls': calls
+            })
+
+        # Einzelne Kamera: scan_camera kalt und warm, get_stream_uri auf bekannter Kamera
+        host = f"{args.network}.{2 + args.auth_failures}"
+        if args.auth_failures < args.cameras:
+            for label in ('scan_camera (kalt)', 'scan_camera (warm)'):
+                if label.endswith('(kalt)'):
+                    reset_scanner_state(cv)
+                fleet_command(conn, 'reset')
+                _, wall_time, cpu_time, threads = measure(
+                    lambda: cv.scan_camera(host, args.port, args.username, args.password))
+                calls = fleet_command(conn, 'stats')
+                results.append({'benchmark': label, 'wall_time': round(wall_time, 3), 'cpu_time': round(cpu_time, 3),
+                                'peak_threads': threads, 'soap_calls_total': sum(calls.values()), 'soap_calls': calls})
+
+            camera = cv.get_onvif_camera(host, args.port, args.username, args.password)
+            fleet_command(conn, 'reset')
+            _, wall_time, cpu_time, threads = measure(
+                lambda: cv.get_stream_uri(camera, args.username, args.password))
+            calls = fleet_command(conn, 'stats')
+            results.append({'benchmark': 'get_stream_uri', 'wall_time': round(wall_time, 3), 'cpu_time': round(cpu_time, 3),
+                            'peak_threads': threads, 'soap_calls_total': sum(calls.values()), 'soap_calls': calls})
+    finally:
+        fleet_command(conn, 'stop')
+        process.join(timeout=5)
+    return results
+
+
+def print_results(results):
+    print(f"{'Benchmark':<22} {'Worker':>6} {'Gefunden':>9} {'Wall [s]':>9} {'CPU [s]':>8} "
+          f"{'Threads':>8} {'SOAP':>6} {'SOAP/Kam':>9}")
+    print('-' * 84)
+    for r in results:
+        found = f"{r['cameras_found']}/{r['cameras_expected']}" if 'cameras_found' in r else ''
+        print(f"{r['benchmark']:<22} {r.get('workers', ''):>6} {found:>9} {r['wall_time']:>9.3f} "
+              f"{r['cpu_time']:>8.3f} {r['peak_threads']:>8} {r['soap_calls_total']:>6} "
+              f"{r.get('soap_calls_per_camera', ''):>9}")
+    print()
+    for r in results:
+        calls = ', '.join(f"{action}={count}" for action, count in sorted(r['soap_calls'].items()))
+        print(f"{r['benchmark']} {r.get('workers', '')}: {calls}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark der Kamera-Erkennung gegen eine simulierte ONVIF-Flotte")
+    parser.add_argument('--cameras', type=int, default=20, help="Anzahl simulierter Kameras (max. 250)")
+    parser.add_argument('--network', default='127.0.0', help="Loopback-Netz der Flotte (/24-Präfix)")
+    parser.add_argument('--port', type=int, default=18888, help="ONVIF-Port der simulierten Kameras")
+    parser.add_argument('--latency', type=float, default=0.01, help="Antwortverzögerung pro SOAP-Aufruf in Sekunden")
+    parser.add_argument('--profiles', type=int, default=2, help="Anzahl Media-Profile pro Kamera")
+    parser.add_argument('--auth-failures', type=int, default=0, help="Anzahl Kameras, die die Anmeldung ablehnen")
+    parser.add_argument('--workers', default='4,16,32', help="Kommagetrennte Worker-Anzahlen für die ONVIF-Prüfung")
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='123456')
+    parser.add_argument('--json', action='store_true', help="Ergebnisse als JSON ausgeben")
+    args = parser.parse_args()
+    args.workers = [int(w) for w in args.workers.split(',') if w.strip()]
+    args.cameras = max(1, min(args.cameras, 250))
+    args.auth_failures = max(0, min(args.auth_failures, args.cameras))
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    results = run_benchmark(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)